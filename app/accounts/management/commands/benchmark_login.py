@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from accounts.views import obtain_token
+
+
+class Command(BaseCommand):
+    """Compare the logins per second of the sync token view
+    with the async view and its login pool"""
+
+    help = "benchmark the sync token view against the async login view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("email")
+        parser.add_argument("password")
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+
+    def handle(self, *args, **options):
+        body = json.dumps(
+            {"email": options["email"], "password": options["password"]}
+        )
+        logins = options["logins"]
+
+        # the sync view, every concurrent login holds a worker thread
+        view = TokenObtainPairView.as_view()
+        factory = RequestFactory()
+
+        def sync_login(_):
+            request = factory.post("/", body, content_type="application/json")
+            try:
+                return view(request).status_code
+            finally:
+                # like the end of a request and the jobs of the login pool
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as workers:
+            codes = list(workers.map(sync_login, range(logins)))
+        self.report("sync view", codes, time.perf_counter() - started)
+
+        # the async view, the logins wait in the loop for the login pool
+        async_factory = AsyncRequestFactory()
+
+        async def async_logins():
+            limit = asyncio.Semaphore(options["concurrency"])
+
+            async def login():
+                async with limit:
+                    request = async_factory.post(
+                        "/", body, content_type="application/json"
+                    )
+                    response = await obtain_token(request)
+                    return response.status_code
+
+            return await asyncio.gather(*(login() for _ in range(logins)))
+
+        # the sync view has no throttle, the logins of one client and
+        # email would be refused after the burst of the token rates
+        started = time.perf_counter()
+        with override_settings(AUTH_THROTTLE_RATES={}):
+            codes = asyncio.run(async_logins())
+        self.report("async view", codes, time.perf_counter() - started)
+
+    def report(self, name, codes, elapsed):
+        ok = codes.count(200)
+        refused = codes.count(503)
+        self.stdout.write(
+            f"{name}: {ok / elapsed:.1f} logins/s, "
+            f"{ok} ok, {refused} refused, {len(codes) - ok - refused} failed"
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:02
+
+import accounts.models
+from django.db import migrations, models
+
+
+# the bits of the permissions when the mask was added
+PERMISSION_BITS = {
+    "admin": 1,
+    "garaze_admin": 2,
+    "technician": 4,
+    "b2b": 8,
+    "customer": 16,
+}
+
+
+def backfill_masks(apps, schema_editor):
+    """Set the mask of every user from the permissions of the m2m"""
+    User = apps.get_model("accounts", "User")
+    masks = {}
+    rows = User.permissions.through.objects.values_list(
+        "user_id",
+        "permissions__name",
+    )
+    for user_id, name in rows.iterator():
+        masks[user_id] = masks.get(user_id, 0) | PERMISSION_BITS.get(name, 0)
+
+    for user_id, mask in masks.items():
+        User.objects.filter(pk=user_id).update(perms_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_perms_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='perms_mask',
+            field=accounts.models.PermissionMaskField(default=0),
+        ),
+        migrations.RunPython(backfill_masks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has_any', 1)), fields=['email'], name='accounts_user_admin_idx'),
+        ),
+    ]
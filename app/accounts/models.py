@@ -8,6 +8,10 @@ from django.utils.translation import gettext_lazy as _
 class UserManager(BaseUserManager):
     """User Manager for the custom User model"""
 
+    def with_permission(self, *names):
+        """The users with one of the permissions"""
+        return self.filter(perms_mask__has_any=permissions_mask(names))
+
     def create_user(self, email, password=None):
         """Create and save User with the email and password"""
         if not email:
@@ -32,6 +36,65 @@ class UserManager(BaseUserManager):
         return user
 
 
+class Permissions(models.Model):
+    """Model who habe all permissions assigned to user."""
+
+    class AdminChoices(models.TextChoices):
+        """Choices class for permission"""
+
+        ADMIN = "admin", _("Admin")
+        GARAZE_ADMIN = "garaze_admin", _("Garaze_admin")
+        TECHNICIAN = "technician", _("Technicial")
+        B2B = "b2b", _("b2b")
+        CUSTOMER = "customer", _("Customer")
+
+    id = models.UUIDField(
+        default=uuid.uuid4, unique=True, primary_key=True, editable=False
+    )
+
+    name = models.CharField(unique=True, choices=AdminChoices.choices)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def save(
+        self, force_insert=False, force_update=False, using=None, update_fields=None
+    ):
+        self.full_clean()
+        return super().save(force_insert, force_update, using, update_fields)
+
+
+# the bit of every permission, new choices are only appended
+PERMISSION_BITS = {
+    name: 1 << index for index, name in enumerate(Permissions.AdminChoices.values)
+}
+
+
+def permissions_mask(names) -> int:
+    """The bitmask of the permission names"""
+    mask = 0
+    for name in names:
+        mask |= PERMISSION_BITS.get(name, 0)
+
+    return mask
+
+
+class PermissionMaskField(models.PositiveIntegerField):
+    """The permissions of a user as a bitmask of PERMISSION_BITS"""
+
+
+@PermissionMaskField.register_lookup
+class HasAnyBits(models.Lookup):
+    """mask__has_any=bits, the mask has at least one of the bits"""
+
+    lookup_name = "has_any"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"({lhs} & {rhs}) <> 0", (*lhs_params, *rhs_params)
+
+
 class User(AbstractBaseUser):
     id = models.UUIDField(
         default=uuid.uuid4, unique=True, primary_key=True, editable=False
@@ -51,9 +114,23 @@ class User(AbstractBaseUser):
     created_at = models.DateTimeField(auto_now_add=True)
     edited_at = models.DateTimeField(auto_now=True)
     permissions = models.ManyToManyField("Permissions")
+    # bumped on every change of the permissions, the tokens
+    # with an older version have stale permission claims
+    perms_version = models.PositiveIntegerField(default=0)
+    # the permissions of the m2m, kept in sync from the signals
+    perms_mask = PermissionMaskField(default=0)
 
     USERNAME_FIELD = "email"
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["email"],
+                condition=models.Q(perms_mask__has_any=PERMISSION_BITS["admin"]),
+                name="accounts_user_admin_idx",
+            )
+        ]
+
     def __str__(self) -> str:
         return self.email
 
@@ -72,34 +149,11 @@ class User(AbstractBaseUser):
         return self.is_admin
 
     @property
-    def user_perms(self) -> list:
-        """Custom user permissions"""
-        return {i.name for i in self.permissions.all()}
-
-
-class Permissions(models.Model):
-    """Model who habe all permissions assigned to user."""
-
-    class AdminChoices(models.TextChoices):
-        """Choices class for permission"""
-
-        ADMIN = "admin", _("Admin")
-        GARAZE_ADMIN = "garaze_admin", _("Garaze_admin")
-        TECHNICIAN = "technician", _("Technicial")
-        B2B = "b2b", _("b2b")
-        CUSTOMER = "customer", _("Customer")
-
-    id = models.UUIDField(
-        default=uuid.uuid4, unique=True, primary_key=True, editable=False
-    )
-
-    name = models.CharField(unique=True, choices=AdminChoices.choices)
-
-    def __str__(self) -> str:
-        return self.name
-
-    def save(
-        self, force_insert=False, force_update=False, using=None, update_fields=None
-    ):
-        self.full_clean()
-        return super().save(force_insert, force_update, using, update_fields)
+    def user_perms(self) -> set:
+        """Custom user permissions, read from the bitmask"""
+        return {
+            name for name, bit in PERMISSION_BITS.items() if self.perms_mask & bit
+        }
+
+    def has_permission(self, name) -> bool:
+        return bool(self.perms_mask & PERMISSION_BITS[name])
@@ -3,6 +3,7 @@ Serializer for the account model
 """
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from accounts.utils import send_activation_mail
 
@@ -45,3 +46,15 @@ class ResetPasswordSerializer(serializers.Serializer):
         style={"input_type": "password"},
         trim_whitespace=False,
     )
+
+
+class TokenSerializer(TokenObtainPairSerializer):
+    """The tokens carry the permissions of the user,
+    so the permission checks need no query"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["perms"] = sorted(user.user_perms)
+        token["perms_version"] = user.perms_version
+        return token
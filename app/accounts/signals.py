@@ -6,8 +6,11 @@ Signals for account model
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 
-from django.db.models.base import post_save
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from accounts.models import PERMISSION_BITS, Permissions, permissions_mask
 from accounts.tasks import delete_inactivate_emails
+from core.authentication import forget_user
 
 
 def call_command_delete_inactive_mail(sender, instance, created, **kwargs):
@@ -19,3 +22,75 @@ def call_command_delete_inactive_mail(sender, instance, created, **kwargs):
 
 
 post_save.connect(call_command_delete_inactive_mail, sender=get_user_model())
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    """The saves, deactivations and password changes
+    drop the user from the authentication cache"""
+    forget_user(instance.pk)
+
+
+post_save.connect(forget_cached_user, sender=get_user_model())
+post_delete.connect(forget_cached_user, sender=get_user_model())
+
+
+def update_perms(user_ids, mask) -> None:
+    """Store the new permission mask of the users,
+    their tokens have stale permission claims"""
+    get_user_model().objects.filter(pk__in=user_ids).update(
+        perms_mask=mask,
+        perms_version=F("perms_version") + 1,
+    )
+    for user_id in user_ids:
+        forget_user(user_id)
+
+
+def permissions_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep the permission mask of the users of the change in sync"""
+    if reverse:
+        # one permission was added to or removed from many users
+        bit = PERMISSION_BITS.get(instance.name, 0)
+        if action == "pre_clear":
+            # the users are known only before the clear
+            instance._cleared_users = list(
+                instance.user_set.values_list("pk", flat=True)
+            )
+        elif action == "post_add":
+            update_perms(pk_set, F("perms_mask").bitor(bit))
+        elif action == "post_remove":
+            update_perms(pk_set, F("perms_mask").bitand(~bit))
+        elif action == "post_clear":
+            update_perms(instance._cleared_users, F("perms_mask").bitand(~bit))
+        return
+
+    if action == "post_clear":
+        mask = 0
+    elif action in ("post_add", "post_remove"):
+        bits = permissions_mask(
+            model.objects.filter(pk__in=pk_set).values_list("name", flat=True)
+        )
+        if action == "post_add":
+            mask = F("perms_mask").bitor(bits)
+        else:
+            mask = F("perms_mask").bitand(~bits)
+    else:
+        return
+
+    update_perms([instance.pk], mask)
+    # a later save of the instance mustn't write back the old values
+    instance.refresh_from_db(fields=["perms_mask", "perms_version"])
+
+
+def permission_deleted(sender, instance, **kwargs):
+    """The m2m rows of a deleted permission are deleted without signals"""
+    update_perms(
+        list(instance.user_set.values_list("pk", flat=True)),
+        F("perms_mask").bitand(~PERMISSION_BITS.get(instance.name, 0)),
+    )
+
+
+m2m_changed.connect(
+    permissions_changed,
+    sender=get_user_model().permissions.through,
+)
+pre_delete.connect(permission_deleted, sender=Permissions)
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 import pytest
 from rest_framework.test import APIClient
 
@@ -47,3 +48,9 @@ def auth_api_client(create_user, def_user):
     client = APIClient()
     client.force_authenticate(user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def clear_throttles():
+    """The rate limit buckets of a test don't leak to the next one"""
+    cache.clear()
@@ -184,6 +184,8 @@ def test_reset_password_submit_failed():
 # -------------------- Test JWT Token --------------------
 
 
+# the login pool threads read the user with their own connection
+@pytest.mark.django_db(transaction=True)
 def test_jwt_create_token_with_is_active_user_should_succeed(
     create_user,
     def_user,
@@ -199,6 +201,7 @@ def test_jwt_create_token_with_is_active_user_should_succeed(
     assert "refresh" in res.data
 
 
+@pytest.mark.django_db(transaction=True)
 def test_jwt_create_token_with_inactive_user_should_fail(
     create_user,
     def_user,
@@ -214,6 +217,7 @@ def test_jwt_create_token_with_inactive_user_should_fail(
     assert "refresh" not in res.data
 
 
+@pytest.mark.django_db(transaction=True)
 def test_jwt_create_token_with_wrong_credentials_should_fail(
     create_user,
     def_user,
@@ -228,6 +232,21 @@ def test_jwt_create_token_with_wrong_credentials_should_fail(
     assert "refresh" not in res.data
 
 
+@pytest.mark.django_db(transaction=True)
+def test_jwt_create_token_error_is_the_simplejwt_error(create_user, def_user):
+    """Test the failed login gives the detail and the header of simplejwt"""
+    create_user(**def_user)
+    def_user["password"] = "wrong-password"
+
+    res = client.post(TOKEN, def_user)
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+    assert res.json() == {
+        "detail": "No active account found with the given credentials"
+    }
+    assert res["WWW-Authenticate"] == 'Bearer realm="api"'
+
+
+@pytest.mark.django_db(transaction=True)
 def test_jwt_refresh_token_with_correct_credentials_should_succeed(
     def_user,
     create_user,
@@ -1,9 +1,10 @@
 """Test the user model"""
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.utils import IntegrityError
 
-from accounts.models import Permissions
+from accounts.models import PERMISSION_BITS, Permissions
 
 
 pytestmark = pytest.mark.django_db
@@ -129,3 +130,43 @@ def test_user_permissions_should_return_a_set_of_permissions(create_superuser):
 
     assert "admin" in admin.user_perms
     assert "customer" in admin.user_perms
+
+
+
+def test_user_permissions_mask_follows_the_m2m(create_superuser):
+    """Test the bitmask is kept in sync with the permissions"""
+    admin = create_superuser
+    admin_perm = Permissions.objects.create(name="admin")
+    customer_perm = Permissions.objects.create(name="customer")
+
+    admin.permissions.add(admin_perm, customer_perm)
+    assert admin.perms_mask == PERMISSION_BITS["admin"] | PERMISSION_BITS["customer"]
+    assert admin.has_permission("customer")
+
+    customer_perm.user_set.remove(admin)
+    admin.refresh_from_db()
+    assert admin.user_perms == {"admin"}
+
+    admin_perm.delete()
+    admin.refresh_from_db()
+    assert admin.perms_mask == 0
+
+
+def test_users_with_permission(create_superuser, def_user):
+    """Test the users are filtered by the bits of the mask"""
+    admin = create_superuser
+    get_user_model().objects.create_user(**def_user)
+    admin.permissions.add(Permissions.objects.create(name="admin"))
+
+    users = get_user_model().objects.with_permission("admin", "b2b")
+    assert list(users) == [admin]
+
+
+def test_users_with_admin_permission_use_the_index():
+    """Test the admin filter matches the partial index"""
+    users = get_user_model().objects.with_permission("admin").order_by("email")
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = users.explain()
+
+    assert "accounts_user_admin_idx" in plan
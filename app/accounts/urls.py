@@ -1,9 +1,6 @@
 from django.urls import path
 from accounts import views
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 
 
 app_name = "accounts"
@@ -20,7 +17,7 @@ urlpatterns = [
     ),
     path(
         "token/",
-        TokenObtainPairView.as_view(),
+        views.obtain_token,
         name="token",
     ),
     path(
@@ -1,17 +1,33 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import default_token_generator
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from rest_framework import generics, status, views
 from accounts.serializers import (
+    TokenSerializer,
     UserSerializer,
     ResetSerializer,
     ResetPasswordSerializer,
 )
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    Throttled,
+)
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenViewBase
 from accounts.models import Permissions
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import CachedJWTAuthentication
+from core.pool import BoundedPool, PoolFull
+from core.throttling import AuthRateThrottle, throttle_wait
 from accounts.utils import send_reset_mail
 
 
@@ -23,6 +39,8 @@ class CreateUserView(generics.CreateAPIView):
     """
 
     serializer_class = UserSerializer
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = "create_user"
 
 
 class ActivateEmail(views.APIView):
@@ -62,7 +80,7 @@ class MyAccountView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
@@ -75,6 +93,8 @@ class ResetPassword(views.APIView):
     """Reset password, 1st step email validation that exists"""
 
     serializer_class = ResetSerializer
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = "reset_password"
 
     def post(self, request):
         email = request.data.get("email", None)
@@ -131,3 +151,90 @@ class ResetPasswordSubmit(views.APIView):
                 data="Passowrd reset Fail",
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+
+# the password hashing of the logins runs in this pool
+LOGIN_POOL = BoundedPool(
+    workers=settings.LOGIN_WORKERS,
+    queue_depth=settings.LOGIN_QUEUE_DEPTH,
+    name="login",
+)
+
+
+def check_credentials(data) -> dict:
+    """Validate the credentials and create the tokens,
+    the password is hashed here"""
+    serializer = TokenSerializer(data=data)
+    try:
+        serializer.is_valid(raise_exception=True)
+    except TokenError as error:
+        raise InvalidToken(error.args[0])
+
+    return serializer.validated_data
+
+
+def render(response) -> Response:
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = "application/json"
+    response.renderer_context = {}
+    return response.render()
+
+
+def render_json(data, status_code, headers=None) -> Response:
+    return render(Response(data=data, status=status_code, headers=headers))
+
+
+def render_error(error, request) -> Response:
+    """The error response that the simplejwt token view gives"""
+    if isinstance(error, AuthenticationFailed):
+        error.auth_header = TokenViewBase().get_authenticate_header(request)
+
+    return render(exception_handler(error, {}))
+
+
+async def obtain_token(request):
+    """Create the jwt tokens of the user
+    With asgi the password hashing runs in the login pool and the loop
+    keeps serving, when the pool is full the login is refused with 503"""
+    if request.method != "POST":
+        return render_json(
+            {"detail": f'Method "{request.method}" not allowed.'},
+            status.HTTP_405_METHOD_NOT_ALLOWED,
+        )
+
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return render_json(
+                {"detail": "JSON parse error"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+    else:
+        data = request.POST
+
+    wait = await sync_to_async(throttle_wait)("token", request, data)
+    if wait:
+        error = Throttled(wait)
+        return render_json(
+            {"detail": error.detail},
+            error.status_code,
+            headers={"Retry-After": str(error.wait)},
+        )
+
+    try:
+        tokens = await LOGIN_POOL.run(check_credentials, data)
+    except PoolFull:
+        return render_json(
+            {"detail": "Too many logins, please try again"},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"},
+        )
+    except APIException as error:
+        return render_error(error, request)
+
+    return render_json(tokens, status.HTTP_200_OK)
+
+
+# csrf_exempt of django 4.2 hides the coroutine, the token has no session
+obtain_token.csrf_exempt = True
@@ -0,0 +1,34 @@
+"""Authentication of the project api"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _user_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def forget_user(user_id) -> None:
+    """Drop the cached user, the next request reads it from the db"""
+    cache.delete(_user_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that keeps the user of the token in the cache
+    for a short time, the user saves and deletes drop it from the cache
+    so the common request makes no query for the user"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # the inactive and missing users fail here and aren't cached
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+
+        return user
@@ -1,19 +1,33 @@
 from rest_framework.permissions import BasePermission
+from rest_framework_simplejwt.tokens import Token
+
+from accounts.models import permissions_mask
 
 
 class UserPermissions(BasePermission):
     def __init__(self, perm_list: list = []) -> None:
         self.perm_list = perm_list
+        self.mask = permissions_mask(perm_list)
 
     def __call__(self):
         return self
 
+    @staticmethod
+    def get_mask(request) -> int:
+        """The permissions of the token claim while its version is the
+        version of the user, else the permissions of the user"""
+        token = request.auth
+        if (
+            isinstance(token, Token)
+            and "perms" in token
+            and token.get("perms_version") == request.user.perms_version
+        ):
+            return permissions_mask(token["perms"])
+
+        return request.user.perms_mask
+
     def has_permission(self, request, view):
         if request.user.is_authenticated:
-            for i in request.user.user_perms:
-                if i in self.perm_list:
-                    return True
-
-                return False
+            return bool(self.get_mask(request) & self.mask)
 
         return False
@@ -0,0 +1,41 @@
+"""Bounded worker pool for the blocking work of the async views"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+
+class PoolFull(Exception):
+    """The pool has as many jobs as its queue allows"""
+
+
+class BoundedPool:
+    """A thread pool with a limit of running and waiting jobs,
+    the jobs over the limit are refused instead of waiting"""
+
+    def __init__(self, workers: int, queue_depth: int, name: str) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=name,
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    async def run(self, func, *args):
+        """Run the function in the pool or raise PoolFull"""
+        if not self.slots.acquire(blocking=False):
+            raise PoolFull()
+
+        future = self.executor.submit(self.call, func, *args)
+        # the slot is freed when the job ends, even if the request is gone
+        future.add_done_callback(lambda _: self.slots.release())
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def call(func, *args):
+        # the threads of the pool live longer than one request
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 import pytest
 
 
@@ -26,3 +27,9 @@ def def_user():
         "password": "testPass1234*",
     }
     return user_dict
+
+
+@pytest.fixture(autouse=True)
+def clear_throttles():
+    """The rate limit buckets of a test don't leak to the next one"""
+    cache.clear()
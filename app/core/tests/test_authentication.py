@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+pytestmark = pytest.mark.django_db
+
+MY_ACCOUNT = reverse("accounts:my_account")
+
+
+@pytest.fixture
+def user(create_user, def_user):
+    return create_user(**def_user)
+
+
+@pytest.fixture
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+def user_queries(context) -> list:
+    return [
+        query
+        for query in context.captured_queries
+        if 'FROM "accounts_user"' in query["sql"]
+    ]
+
+
+def test_cached_user_makes_no_query(token_client):
+    """Test only the first request reads the user from the db"""
+    with CaptureQueriesContext(connection) as context:
+        res = token_client.get(MY_ACCOUNT)
+    assert res.status_code == status.HTTP_200_OK
+    assert len(user_queries(context)) == 1
+
+    with CaptureQueriesContext(connection) as context:
+        res = token_client.get(MY_ACCOUNT)
+    assert res.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+
+
+def test_user_save_drops_the_cache(token_client, user):
+    token_client.get(MY_ACCOUNT)
+
+    user.email = "changed@example.com"
+    user.save()
+
+    res = token_client.get(MY_ACCOUNT)
+    assert res.data["email"] == "changed@example.com"
+
+
+def test_deactivated_user_should_fail(token_client, user):
+    token_client.get(MY_ACCOUNT)
+
+    user.is_active = False
+    user.save()
+
+    res = token_client.get(MY_ACCOUNT)
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_deleted_user_should_fail(token_client, user):
+    token_client.get(MY_ACCOUNT)
+
+    user.delete()
+
+    res = token_client.get(MY_ACCOUNT)
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
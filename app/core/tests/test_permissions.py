@@ -1,4 +1,13 @@
 from unittest.mock import patch, Mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import PERMISSION_BITS, Permissions
 from core.perm_class import UserPermissions
 
 
@@ -23,7 +32,7 @@ def test_User_permisions_has_permissions_should_succeed():
     mock_request = Mock()
     mock_request.user = Mock()
     mock_request.user.is_authenticated = True
-    mock_request.user.user_perms = {"admin"}
+    mock_request.user.perms_mask = PERMISSION_BITS["admin"]
     permission = UserPermissions(perm_list=["admin"])
     perms = permission().has_permission(mock_request, None)
     assert perms is True
@@ -35,7 +44,7 @@ def test_User_permisions_has_not_permissions_should_fail():
     mock_request = Mock()
     mock_request.user = Mock()
     mock_request.user.is_authenticated = True
-    mock_request.user.user_perms = {"admin"}
+    mock_request.user.perms_mask = PERMISSION_BITS["admin"]
     permission = UserPermissions(perm_list=["customer"])
     perms = permission().has_permission(mock_request, None)
     assert perms is False
@@ -50,3 +59,69 @@ def test_User_permisions_is_unauthenticated():
     permission = UserPermissions(perm_list=["customer"])
     perms = permission().has_permission(mock_request, None)
     assert perms is False
+
+
+# -------------------- Permission claims tests --------------------
+
+TOKEN = reverse("accounts:token")
+TEAM_CALC = reverse("worktime:team_calc")
+TEAM_PAYLOAD = {"from_date": "2020-01-01", "to_date": "2020-01-31"}
+
+
+@pytest.fixture
+def admin_user(create_user, def_user):
+    user = create_user(**def_user)
+    user.permissions.add(Permissions.objects.create(name="admin"))
+    return user
+
+
+@pytest.fixture
+def admin_client(admin_user, def_user):
+    res = APIClient().post(TOKEN, def_user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+    return client
+
+
+def permission_queries(context) -> list:
+    return [
+        query
+        for query in context.captured_queries
+        if "accounts_permissions" in query["sql"]
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_token_has_permission_claims(admin_user, def_user):
+    res = APIClient().post(TOKEN, def_user)
+
+    token = AccessToken(res.data["access"])
+    assert token["perms"] == ["admin"]
+    assert token["perms_version"] == admin_user.perms_version
+
+
+@pytest.mark.django_db(transaction=True)
+def test_permission_claim_makes_no_query(admin_client):
+    """Test the permission is checked from the token claim"""
+    with CaptureQueriesContext(connection) as context:
+        res = admin_client.post(TEAM_CALC, TEAM_PAYLOAD)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert permission_queries(context) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_removed_permission_revokes_the_claim(admin_client, admin_user):
+    admin_user.permissions.clear()
+
+    res = admin_client.post(TEAM_CALC, TEAM_PAYLOAD)
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_reverse_change_bumps_the_version(admin_user):
+    version = admin_user.perms_version
+    Permissions.objects.get(name="admin").user_set.remove(admin_user)
+
+    admin_user.refresh_from_db()
+    assert admin_user.perms_version == version + 1
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import views
+from core.pool import BoundedPool, PoolFull
+
+TOKEN = reverse("accounts:token")
+
+
+def test_pool_runs_the_job():
+    pool = BoundedPool(workers=1, queue_depth=0, name="test")
+
+    assert asyncio.run(pool.run(sum, [1, 2])) == 3
+
+
+def test_full_pool_refuses_the_job():
+    """Test the jobs over the workers and the queue are refused"""
+    pool = BoundedPool(workers=1, queue_depth=1, name="test")
+    release = threading.Event()
+
+    async def run():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PoolFull):
+            await pool.run(release.wait)
+
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(run()) == [True, True]
+    # the slots are free again
+    assert asyncio.run(pool.run(sum, [1])) == 1
+
+
+def test_login_with_full_pool_should_fail(monkeypatch, def_user):
+    """Test the login is refused with 503 when the pool is full"""
+    pool = BoundedPool(workers=1, queue_depth=0, name="test")
+    pool.slots.acquire()
+    monkeypatch.setattr(views, "LOGIN_POOL", pool)
+
+    res = APIClient().post(TOKEN, def_user)
+    assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert res["Retry-After"] == "1"
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import throttling
+
+CREATE_USER = reverse("accounts:create_user")
+RESET_PASS = reverse("accounts:reset_password_email")
+TOKEN = reverse("accounts:token")
+
+
+@pytest.fixture
+def rates(settings):
+    settings.AUTH_THROTTLE_RATES = {
+        "token": {"ip": "5/min", "email": "2/min"},
+        "reset_password": {"ip": "2/hour"},
+        "create_user": {"ip": "1/hour"},
+    }
+
+
+def test_parse_rate():
+    assert throttling.parse_rate("5/min") == (5, 5 / 60)
+    assert throttling.parse_rate("10/hour") == (10, 10 / 3600)
+
+
+def test_bucket_refills(monkeypatch):
+    """Test the burst is allowed and the tokens come back with the rate"""
+    now = 1000.0
+    monkeypatch.setattr(throttling.time, "time", lambda: now)
+    buckets = [("throttle:test:ip:1", 2, 1 / 10)]
+
+    assert throttling.take(buckets) == 0
+    assert throttling.take(buckets) == 0
+    assert throttling.take(buckets) == pytest.approx(10)
+
+    now += 5
+    assert throttling.take(buckets) == pytest.approx(5)
+    now += 5
+    assert throttling.take(buckets) == 0
+
+
+def test_refused_request_takes_no_token():
+    """Test a request refused by one bucket takes nothing from the others"""
+    ip = ("throttle:test:ip:1", 5, 1 / 60)
+    email = ("throttle:test:email:a", 1, 1 / 60)
+
+    assert throttling.take([ip, email]) == 0
+    assert throttling.take([ip, email]) > 0
+    for _ in range(4):
+        assert throttling.take([ip]) == 0
+    assert throttling.take([ip]) > 0
+
+
+@pytest.mark.django_db
+def test_create_user_is_throttled(rates, def_user):
+    client = APIClient()
+    client.post(CREATE_USER, def_user)
+
+    res = client.post(CREATE_USER, {**def_user, "email": "other@example.com"})
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(res["Retry-After"]) > 0
+
+
+@pytest.mark.django_db
+def test_reset_password_is_throttled_per_ip(rates):
+    payload = {"email": "something@dontexist.com"}
+    for address in ["10.0.0.1", "10.0.0.1"]:
+        res = APIClient(REMOTE_ADDR=address).post(RESET_PASS, payload)
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = APIClient(REMOTE_ADDR="10.0.0.1").post(RESET_PASS, payload)
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    res = APIClient(REMOTE_ADDR="10.0.0.2").post(RESET_PASS, payload)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_forwarded_for_gives_no_new_bucket(rates):
+    """Test a client can't take a fresh bucket with its own X-Forwarded-For"""
+    payload = {"email": "something@dontexist.com"}
+    for forwarded in ["1.1.1.1", "2.2.2.2"]:
+        client = APIClient(REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded)
+        res = client.post(RESET_PASS, payload)
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    client = APIClient(REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="3.3.3.3")
+    res = client.post(RESET_PASS, payload)
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db(transaction=True)
+def test_token_is_throttled_per_email(rates, def_user):
+    """Test the logins of one email are limited from every ip"""
+    payload = {**def_user, "password": "wrong"}
+    for address in ["10.0.0.1", "10.0.0.2"]:
+        res = APIClient(REMOTE_ADDR=address).post(TOKEN, payload)
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    res = APIClient(REMOTE_ADDR="10.0.0.3").post(TOKEN, payload)
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert res["Retry-After"] == "30"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login_benchmark_is_not_throttled(rates, create_user, def_user):
+    """Test the async logins of the benchmark are not refused by the rates"""
+    create_user(**def_user)
+    out = StringIO()
+    call_command(
+        "benchmark_login",
+        def_user["email"],
+        def_user["password"],
+        logins=12,
+        concurrency=2,
+        stdout=out,
+    )
+
+    assert "async view" in out.getvalue()
+    assert "12 ok, 0 refused, 0 failed" in out.getvalue().split("async view")[1]
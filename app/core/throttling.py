@@ -0,0 +1,134 @@
+"""Token bucket rate limits of the auth endpoints
+
+Every request takes one token from the bucket of the client ip and from
+the bucket of the email, the buckets refill with the rate of the scope.
+With redis all the buckets of a request are checked and taken with one
+script call, the other cache backends use a lock of the process."""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS are the buckets, ARGV the capacity and the refill per second of
+# every bucket, the tokens are taken only if every bucket has one
+TAKE_SCRIPT = """
+local now = redis.call("TIME")
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call("HMGET", key, "tokens", "at")
+    local tokens = tonumber(state[1]) or capacity
+    local at = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - at) * rate)
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - 1
+    end
+    redis.call("HSET", key, "tokens", tostring(tokens), "at", tostring(now))
+    redis.call("EXPIRE", key, math.ceil(capacity / rate) + 1)
+end
+return tostring(wait)
+"""
+
+_lock = threading.Lock()
+
+
+def parse_rate(rate: str) -> tuple:
+    """The capacity and the refill per second of "count/period" """
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def _take_redis(backend, buckets) -> float:
+    client = backend._cache.get_client(write=True)
+    script = client.register_script(TAKE_SCRIPT)
+    args = []
+    for _, capacity, rate in buckets:
+        args += [capacity, rate]
+
+    keys = [backend.make_key(key) for key, _, _ in buckets]
+    return float(script(keys=keys, args=args))
+
+
+def _take_local(backend, buckets) -> float:
+    now = time.time()
+    with _lock:
+        states = backend.get_many([key for key, _, _ in buckets])
+        wait = 0.0
+        levels = []
+        for key, capacity, rate in buckets:
+            tokens, at = states.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - at) * rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+            levels.append(tokens)
+
+        taken = 0 if wait else 1
+        backend.set_many(
+            {
+                key: (tokens - taken, now)
+                for (key, _, _), tokens in zip(buckets, levels)
+            },
+            timeout=max(capacity / rate for _, capacity, rate in buckets) + 1,
+        )
+
+    return wait
+
+
+def take(buckets) -> float:
+    """Take a token of every bucket, the buckets are (key, capacity, rate)
+
+    Returns 0 or the seconds until all the buckets have a token"""
+    if not buckets:
+        return 0.0
+
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        return _take_redis(backend, buckets)
+
+    return _take_local(backend, buckets)
+
+
+def throttle_wait(scope, request, data) -> float:
+    """Take the tokens of the client ip and of the email of the data"""
+    rates = settings.AUTH_THROTTLE_RATES.get(scope, {})
+    idents = {"ip": BaseThrottle().get_ident(request)}
+    email = data.get("email") if hasattr(data, "get") else None
+    if isinstance(email, str) and email.strip():
+        idents["email"] = email.strip().lower()
+
+    return take(
+        [
+            (f"throttle:{scope}:{kind}:{ident}", *parse_rate(rates[kind]))
+            for kind, ident in idents.items()
+            if kind in rates
+        ]
+    )
+
+
+class AuthRateThrottle(BaseThrottle):
+    """Token bucket throttle of the view throttle_scope"""
+
+    def allow_request(self, request, view):
+        self.wait_time = throttle_wait(view.throttle_scope, request, request.data)
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
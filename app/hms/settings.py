@@ -95,6 +95,55 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# seconds that the worktime calculator results stay in the cache
+WORKTIME_CALC_CACHE_TIMEOUT = int(
+    os.environ.get("WORKTIME_CALC_CACHE_TIMEOUT", 300),
+)
+
+# shifts with more work days are recomputed in the celery workers
+WORKTIME_RECOMPUTE_ASYNC_ROWS = int(
+    os.environ.get("WORKTIME_RECOMPUTE_ASYNC_ROWS", 5000),
+)
+
+# seconds that the user of a token is kept in the cache
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
+# threads that hash the login passwords and the logins that can wait
+# for them, the logins over the limit are answered with 503
+LOGIN_WORKERS = int(os.environ.get("LOGIN_WORKERS", 4))
+LOGIN_QUEUE_DEPTH = int(os.environ.get("LOGIN_QUEUE_DEPTH", 32))
+
+# token bucket rates of the auth endpoints per client ip and per email,
+# 5/min is a burst of 5 requests that refills 5 tokens per minute
+AUTH_THROTTLE_RATES = {
+    "token": {"ip": "30/min", "email": "10/min"},
+    "reset_password": {"ip": "10/hour", "email": "3/hour"},
+    "create_user": {"ip": "10/hour", "email": "3/hour"},
+}
+
+# days that the deleted days and shifts are kept for the delta sync
+WORKTIME_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get("WORKTIME_TOMBSTONE_RETENTION_DAYS", 30),
+)
+
+# seconds that the sync goes back from the cursor, so the changes
+# that were committed late are given again and never lost
+WORKTIME_SYNC_OVERLAP = int(os.environ.get("WORKTIME_SYNC_OVERLAP", 5))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -152,12 +201,16 @@ AUTH_USER_MODEL = "accounts.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ),
+    # proxies in front of the app whose X-Forwarded-For is trusted for
+    # the client ip of the throttles, with 0 the client ip is REMOTE_ADDR
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(hours=9),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.TokenSerializer",
 }
 SPECTACULAR_SETTINGS = {"COMPONENT_SPLIT_REQUEST": True}
 
@@ -173,6 +226,14 @@ CELERY_RESULT_BACKEND = os.environ.get(
     "CELERY_BACKEND",
     "redis://redis:6379/0",
 )
+
+# periodic tasks, the worker runs the beat with -B
+CELERY_BEAT_SCHEDULE = {
+    "purge-worktime-tombstones": {
+        "task": "worktime.tasks.purge_tombstones",
+        "schedule": 24 * 60 * 60,
+    },
+}
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
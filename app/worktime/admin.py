@@ -1,8 +1,45 @@
 from django.contrib import admin
-from worktime.models import Shift, WorkDay
+from django.db import transaction
+from worktime.models import ImportJob, Shift, WorkDay, WorkDayMonth
+from worktime.tasks import import_workdays
 
 # Register your models here.
 
 
 admin.site.register(Shift)
 admin.site.register(WorkDay)
+admin.site.register(WorkDayMonth)
+
+
+class ImportJobAdmin(admin.ModelAdmin):
+    """Upload a timesheets file, the import runs in the workers"""
+
+    list_display = ("file", "status", "processed", "imported", "failed")
+    readonly_fields = [
+        "owner",
+        "status",
+        "processed",
+        "imported",
+        "failed",
+        "errors_file",
+        "error",
+        "created_at",
+        "finished_at",
+    ]
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return self.readonly_fields + ["file"]
+
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+
+        obj.owner = request.user
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(lambda: import_workdays.delay(str(obj.pk)))
+
+
+admin.site.register(ImportJob, ImportJobAdmin)
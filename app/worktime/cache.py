@@ -0,0 +1,98 @@
+"""Versioned cache for the calculator results
+
+Every owner has a version counter that is part of the result keys,
+bumping the counter invalidates all the cached results of the owner."""
+import math
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+HITS_KEY = "worktime:calc:hits"
+MISSES_KEY = "worktime:calc:misses"
+
+
+def _version_key(owner_id) -> str:
+    return f"worktime:version:{owner_id}"
+
+
+def _changed_key(owner_id) -> str:
+    return f"worktime:changed:{owner_id}"
+
+
+def _incr(key) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_version(owner_id) -> int:
+    # a new counter starts from the time so an evicted counter
+    # never falls back to a version that has cached results
+    version = time.time_ns()
+    if cache.add(_version_key(owner_id), version, timeout=None):
+        return version
+
+    return cache.get(_version_key(owner_id), version)
+
+
+def bump_version(owner_id) -> None:
+    """Invalidate all the cached results of the owner"""
+    try:
+        cache.incr(_version_key(owner_id))
+    except ValueError:
+        cache.set(_version_key(owner_id), time.time_ns(), timeout=None)
+    _touch(owner_id)
+
+
+def _touch(owner_id) -> None:
+    # the http dates have whole seconds, the time of every change is a
+    # later second than the Last-Modified of any response before it
+    changed = math.ceil(time.time())
+    previous = cache.get(_changed_key(owner_id))
+    if previous is not None and changed <= previous:
+        changed = previous + 1
+    cache.set(_changed_key(owner_id), changed, timeout=None)
+
+
+def bump_version_on_commit(owner_id) -> None:
+    """Bump the version when the transaction of the change commits,
+    a calculation before the commit reads the old rows and caches
+    them under the old version, never under the new one"""
+    transaction.on_commit(lambda: bump_version(owner_id))
+
+
+def changed_at(owner_id) -> datetime:
+    """The time of the last change of the owner data,
+    an evicted time starts again from now"""
+    changed = math.ceil(time.time())
+    if not cache.add(_changed_key(owner_id), changed, timeout=None):
+        changed = cache.get(_changed_key(owner_id), changed)
+
+    return datetime.fromtimestamp(changed, tz=timezone.utc)
+
+
+def get_or_calculate(owner_id, start, end, calculate) -> dict:
+    """Return the cached result of the range or calculate and cache it"""
+    key = f"worktime:calc:{owner_id}:{get_version(owner_id)}:{start}:{end}"
+    data = cache.get(key)
+    if data is not None:
+        _incr(HITS_KEY)
+        return data
+
+    _incr(MISSES_KEY)
+    data = calculate()
+    cache.set(key, data, timeout=settings.WORKTIME_CALC_CACHE_TIMEOUT)
+    return data
+
+
+def stats() -> dict:
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": values.get(HITS_KEY, 0),
+        "misses": values.get(MISSES_KEY, 0),
+    }
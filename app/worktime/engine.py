@@ -0,0 +1,90 @@
+"""Payroll rules of the work days
+
+The rules are configured per shift and they are evaluated in two forms,
+as sql expressions for the aggregations of many days in the db and in
+python for a single day that moves the monthly rollups."""
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Q, Sum
+from django.db.models.functions import Coalesce, Least
+
+# (0, "Normal"),
+# (1, "Weekend"),
+# (2, "Times off"),
+# (3, "Sick leave"),
+# (4, "Public holiday"),
+# (5, "Job Travel"),
+DAY_COUNTERS = {
+    0: "workdays",
+    1: "weekend",
+    2: "times_off",
+    3: "sick_leaves",
+    4: "publick_holidays",
+    5: "job_travel",
+}
+RULE_FIELDS = [
+    "late_threshold",
+    "early_leave_threshold",
+    "overtime_threshold",
+    "overtime_cap",
+    "rounding",
+]
+
+
+def _rounded(value, rounding):
+    """Round down the minutes to the step of the shift"""
+    return ExpressionWrapper(value / rounding * rounding, output_field=IntegerField())
+
+
+def totals_expressions(prefix="shift__") -> dict:
+    """Conditional aggregates for every counter of the calculator,
+    prefix is the path from the aggregated model to the shift"""
+    rule = {name: F(prefix + name) for name in RULE_FIELDS}
+    normal = Q(day=0)
+    late = _rounded(F("before_work"), rule["rounding"])
+    overtime = Least(
+        _rounded(F("after_work"), rule["rounding"]),
+        Coalesce(rule["overtime_cap"], F("after_work"), output_field=IntegerField()),
+    )
+    expressions = {
+        "late_for_work": Coalesce(
+            Sum(late, filter=normal & Q(before_work__gt=rule["late_threshold"])),
+            0,
+        ),
+        "overtime": Coalesce(
+            Sum(
+                overtime,
+                filter=normal & Q(after_work__gte=rule["overtime_threshold"]),
+            ),
+            0,
+        ),
+        "early_leave": Coalesce(
+            Sum(
+                "after_work",
+                filter=normal & Q(after_work__lt=-rule["early_leave_threshold"]),
+            ),
+            0,
+        ),
+    }
+    for day, name in DAY_COUNTERS.items():
+        expressions[name] = Count("pk", filter=Q(day=day))
+
+    return expressions
+
+
+def contribution(day, before_work, after_work, shift) -> dict:
+    """What a single work day adds to the counters of its month"""
+    day = int(day)
+    delta = {DAY_COUNTERS[day]: 1}
+    if day != 0:
+        return delta
+
+    if before_work is not None and before_work > shift.late_threshold:
+        delta["late_for_work"] = before_work // shift.rounding * shift.rounding
+    if after_work is not None and after_work >= shift.overtime_threshold:
+        overtime = after_work // shift.rounding * shift.rounding
+        if shift.overtime_cap is not None:
+            overtime = min(overtime, shift.overtime_cap)
+        delta["overtime"] = overtime
+    if after_work is not None and after_work < -shift.early_leave_threshold:
+        delta["early_leave"] = after_work
+
+    return delta
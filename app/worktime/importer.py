@@ -0,0 +1,150 @@
+"""Import of historic timesheets in the work days
+
+The file is read as a stream and the rows are validated and inserted
+in fixed size batches, so the memory doesn't grow with the file."""
+import csv
+import io
+import tempfile
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from worktime.cache import bump_version_on_commit
+from worktime.models import ImportJob, Shift, WorkDay
+from worktime.rollup import rebuild_months
+from worktime.serializers import WorkDaySerializer
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_COLUMNS = [
+    "email",
+    "date",
+    "day",
+    "start_of_work",
+    "end_of_work",
+    "shift",
+    "comment",
+]
+
+
+def read_csv(file):
+    yield from csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig"))
+
+
+def read_xlsx(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(name).strip() for name in next(rows, [])]
+    for values in rows:
+        row = dict(zip(header, values))
+        if isinstance(row.get("date"), datetime):
+            row["date"] = row["date"].date()
+        yield row
+
+    workbook.close()
+
+
+def read_rows(file):
+    """The rows of the csv or xlsx file as dicts"""
+    if file.name.lower().endswith(".xlsx"):
+        return read_xlsx(file)
+
+    return read_csv(file)
+
+
+def import_batch(rows) -> tuple:
+    """Validate and insert one batch of rows
+
+    Returns the rows imported and the rows with errors"""
+    # the dates are parsed first, the db can't compare the invalid ones
+    date_field = serializers.DateField()
+    parsed, errors = [], []
+    for row in rows:
+        try:
+            parsed.append((row, date_field.run_validation(row.get("date"))))
+        except serializers.ValidationError as error:
+            errors.append((row, {"date": error.detail}))
+
+    emails = {row.get("email") for row, _ in parsed}
+    users = {
+        user.email: user
+        for user in get_user_model().objects.filter(email__in=emails)
+    }
+    shifts = {}
+    for shift in Shift.objects.filter(owner__in=users.values()):
+        shifts.setdefault(shift.owner_id, {})[shift.pk] = shift
+    existing = {}
+    for owner_id, day in WorkDay.objects.filter(
+        owner__in=users.values(),
+        date__in={day for _, day in parsed},
+    ).values_list("owner_id", "date"):
+        existing.setdefault(owner_id, set()).add(day)
+
+    days = []
+    for row, _ in parsed:
+        user = users.get(row.get("email"))
+        if user is None:
+            errors.append((row, {"email": ["User does not exist."]}))
+            continue
+
+        context = {
+            "shifts": shifts.get(user.pk, {}),
+            "existing_dates": existing.setdefault(user.pk, set()),
+        }
+        data = {key: value for key, value in row.items() if value not in ("", None)}
+        serializer = WorkDaySerializer(data=data, context=context)
+        if not serializer.is_valid():
+            errors.append((row, serializer.errors))
+            continue
+
+        days.append(WorkDay(**serializer.validated_data, owner=user))
+        context["existing_dates"].add(serializer.validated_data["date"])
+
+    with transaction.atomic():
+        WorkDay.objects.bulk_create(days)
+        rebuild_months(WorkDay.objects.filter(pk__in=[day.pk for day in days]))
+        # every batch commits alone, a later batch may fail
+        for owner_id in {day.owner_id for day in days}:
+            bump_version_on_commit(owner_id)
+
+    return len(days), errors
+
+
+def run_import(job, batch_size=None) -> ImportJob:
+    """Import the file of the job, the progress is saved after every batch
+    and the rows with errors are written to the errors file of the job"""
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    ImportJob.objects.filter(pk=job.pk).update(status=ImportJob.Status.RUNNING)
+
+    with job.file.open("rb") as file, tempfile.TemporaryFile("w+") as errors:
+        writer = csv.writer(errors)
+        writer.writerow(IMPORT_COLUMNS + ["errors"])
+        rows = read_rows(file)
+        while batch := list(islice(rows, batch_size)):
+            imported, failed = import_batch(batch)
+            for row, error in failed:
+                writer.writerow([row.get(key) for key in IMPORT_COLUMNS] + [error])
+
+            job.processed += len(batch)
+            job.imported += imported
+            job.failed += len(failed)
+            ImportJob.objects.filter(pk=job.pk).update(
+                processed=job.processed,
+                imported=job.imported,
+                failed=job.failed,
+            )
+
+        errors.seek(0)
+        if job.failed:
+            job.errors_file.save(f"{job.pk}-errors.csv", File(errors), save=False)
+
+    job.status = ImportJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["errors_file", "status", "finished_at"])
+    return job
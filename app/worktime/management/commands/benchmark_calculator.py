@@ -0,0 +1,74 @@
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from worktime.models import WorkDay
+
+
+def per_row_totals(query) -> dict:
+    """The calculator before the rule engine, one row at a time in python"""
+    query_0 = query.filter(day=0)
+    late_for_work = 0
+    overtime = 0
+    early_leave = 0
+
+    for i in query_0:
+        if i.before_work > 0:
+            late_for_work += i.before_work
+        if i.after_work >= 15:
+            overtime += i.after_work
+        if i.after_work < 0:
+            early_leave += i.after_work
+
+    return {
+        "late_for_work": late_for_work,
+        "overtime": overtime,
+        "early_leave": early_leave,
+        "workdays": query_0.count(),
+        "weekend": query.filter(day=1).count(),
+        "times_off": query.filter(day=2).count(),
+        "sick_leaves": query.filter(day=3).count(),
+        "publick_holidays": query.filter(day=4).count(),
+        "job_travel": query.filter(day=5).count(),
+    }
+
+
+class Command(BaseCommand):
+    """Compare the per row calculator with the rule engine aggregates"""
+
+    help = "benchmark the per row calculator against the rule engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="only the days of this user")
+        parser.add_argument("--from", dest="from_date", type=date.fromisoformat)
+        parser.add_argument("--to", dest="to_date", type=date.fromisoformat)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        query = WorkDay.objects.all()
+        if options["email"]:
+            user = get_user_model().objects.get(email=options["email"])
+            query = query.filter(owner=user)
+        if options["from_date"]:
+            query = query.filter(date__gte=options["from_date"])
+        if options["to_date"]:
+            query = query.filter(date__lte=options["to_date"])
+
+        self.stdout.write(f"{query.count()} work days")
+        results = {}
+        for name, calculate in [
+            ("per row", per_row_totals),
+            ("engine", lambda query: query.totals()),
+        ]:
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                results[name] = calculate(query)
+            elapsed = (time.perf_counter() - started) / options["repeat"]
+            self.stdout.write(f"{name}: {elapsed * 1000:.1f} ms")
+
+        if results["per row"] != results["engine"]:
+            self.stdout.write(self.style.WARNING("the results are different"))
+        else:
+            self.stdout.write(self.style.SUCCESS("the results are the same"))
@@ -0,0 +1,49 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from worktime.importer import run_import
+from worktime.models import ImportJob
+from worktime.tasks import import_workdays
+
+
+class Command(BaseCommand):
+    """Import historic timesheets from a csv or xlsx file
+
+    The columns are email, date, day, start_of_work, end_of_work,
+    shift and comment"""
+
+    help = "import historic timesheets from a csv or xlsx file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="import here instead of the celery workers",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.lower().endswith((".csv", ".xlsx")):
+            raise CommandError("The file should be csv or xlsx")
+
+        job = ImportJob()
+        with open(path, "rb") as file:
+            job.file.save(os.path.basename(path), File(file))
+
+        if not options["now"]:
+            import_workdays.delay(str(job.pk))
+            self.stdout.write(f"import {job.pk} started in the workers")
+            return
+
+        job = run_import(job)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{job.processed} rows, {job.imported} imported, "
+                f"{job.failed} failed"
+            )
+        )
+        if job.failed:
+            self.stdout.write(f"the failed rows are in {job.errors_file.path}")
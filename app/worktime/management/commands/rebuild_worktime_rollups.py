@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from worktime.rollup import rebuild_months
+
+
+class Command(BaseCommand):
+    """Rebuild the monthly rollups of the work days from scratch"""
+
+    help = "rebuild the monthly rollups of the work days from scratch"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            months = rebuild_months()
+
+        self.stdout.write(self.style.SUCCESS(f"{months} months rebuilt"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from worktime.models import Shift
+from worktime.recompute import recompute_shift_minutes
+
+
+class Command(BaseCommand):
+    """Recompute before_work/after_work of the work days from the shifts"""
+
+    help = "recompute before_work/after_work of the work days from the shifts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="only the shifts of this user")
+
+    def handle(self, *args, **options):
+        shifts = Shift.objects.all()
+        if options["email"]:
+            shifts = shifts.filter(owner__email=options["email"])
+
+        started = time.perf_counter()
+        rows = 0
+        for shift in shifts.iterator():
+            with transaction.atomic():
+                rows += recompute_shift_minutes(shift)[0]
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{rows} rows touched in {elapsed:.2f} seconds")
+        )
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.functions
+import django.db.models.deletion
+
+
+def backfill_months(apps, schema_editor):
+    WorkDay = apps.get_model("worktime", "WorkDay")
+    WorkDayMonth = apps.get_model("worktime", "WorkDayMonth")
+    normal = models.Q(day=0)
+    rows = (
+        WorkDay.objects.order_by()
+        .annotate(month=models.functions.TruncMonth("date"))
+        .values("owner_id", "month")
+        .annotate(
+            late_for_work=models.functions.Coalesce(
+                models.Sum("before_work", filter=normal & models.Q(before_work__gt=0)), 0
+            ),
+            overtime=models.functions.Coalesce(
+                models.Sum("after_work", filter=normal & models.Q(after_work__gte=15)), 0
+            ),
+            early_leave=models.functions.Coalesce(
+                models.Sum("after_work", filter=normal & models.Q(after_work__lt=0)), 0
+            ),
+            workdays=models.Count("pk", filter=normal),
+            weekend=models.Count("pk", filter=models.Q(day=1)),
+            times_off=models.Count("pk", filter=models.Q(day=2)),
+            sick_leaves=models.Count("pk", filter=models.Q(day=3)),
+            publick_holidays=models.Count("pk", filter=models.Q(day=4)),
+            job_travel=models.Count("pk", filter=models.Q(day=5)),
+        )
+    )
+    WorkDayMonth.objects.bulk_create(
+        (WorkDayMonth(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('worktime', '0004_workday_after_work_workday_before_work'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkDayMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('late_for_work', models.IntegerField(default=0)),
+                ('overtime', models.IntegerField(default=0)),
+                ('early_leave', models.IntegerField(default=0)),
+                ('workdays', models.IntegerField(default=0)),
+                ('weekend', models.IntegerField(default=0)),
+                ('times_off', models.IntegerField(default=0)),
+                ('sick_leaves', models.IntegerField(default=0)),
+                ('publick_holidays', models.IntegerField(default=0)),
+                ('job_travel', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['month'],
+                'unique_together': {('owner', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_months, migrations.RunPython.noop),
+    ]
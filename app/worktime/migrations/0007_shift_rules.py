@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:33
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worktime', '0006_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shift',
+            name='early_leave_threshold',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='late_threshold',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='overtime_cap',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='overtime_threshold',
+            field=models.PositiveSmallIntegerField(default=15),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='rounding',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
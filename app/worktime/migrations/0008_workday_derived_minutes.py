@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:38
+
+from django.db import migrations
+from importlib import import_module
+import worktime.models
+
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION worktime_workday_minutes() RETURNS trigger AS $$
+DECLARE
+    shift_start time;
+    shift_end time;
+BEGIN
+    IF NEW.day = 0 THEN
+        SELECT start_of_shift, end_of_shift INTO shift_start, shift_end
+        FROM worktime_shift WHERE id = NEW.shift_id;
+        NEW.before_work := TRUNC(
+            EXTRACT(EPOCH FROM (NEW.start_of_work - shift_start)) / 60
+        )::integer;
+        NEW.after_work := TRUNC(
+            EXTRACT(EPOCH FROM (NEW.end_of_work - shift_end)) / 60
+        )::integer;
+    ELSE
+        NEW.before_work := NULL;
+        NEW.after_work := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER worktime_workday_minutes
+BEFORE INSERT OR UPDATE ON worktime_workday
+FOR EACH ROW EXECUTE FUNCTION worktime_workday_minutes();
+
+UPDATE worktime_workday SET day = day;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS worktime_workday_minutes ON worktime_workday;
+DROP FUNCTION IF EXISTS worktime_workday_minutes();
+"""
+
+
+def rebuild_months(apps, schema_editor):
+    """The trigger computed the minutes of the old rows again"""
+    apps.get_model("worktime", "WorkDayMonth").objects.all().delete()
+    import_module("worktime.migrations.0005_workdaymonth").backfill_months(
+        apps, schema_editor
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worktime', '0007_shift_rules'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workday',
+            name='after_work',
+            field=worktime.models.DerivedMinutesField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='workday',
+            name='before_work',
+            field=worktime.models.DerivedMinutesField(null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.RunPython(rebuild_months, migrations.RunPython.noop),
+    ]
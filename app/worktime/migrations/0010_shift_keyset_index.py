@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worktime', '0009_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='worktime_sh_owner_i_977007_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:54
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the writes of the days
+    atomic = False
+
+    dependencies = [
+        ('worktime', '0011_workday_sync'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workday',
+            index=models.Index(fields=['owner', 'date'], include=('day', 'before_work', 'after_work', 'shift'), name='worktime_workday_totals_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='workday',
+            index=models.Index(condition=models.Q(('day', 0)), fields=['shift'], name='worktime_workday_normal_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 """Models for the worktime app"""
 import uuid
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
+
+from worktime import engine
 
 
 # Create your models here.
@@ -21,10 +24,62 @@ class Shift(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     edited_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    # payroll rules of the shift, in minutes
+    late_threshold = models.PositiveSmallIntegerField(default=0)
+    early_leave_threshold = models.PositiveSmallIntegerField(default=0)
+    overtime_threshold = models.PositiveSmallIntegerField(default=15)
+    overtime_cap = models.PositiveSmallIntegerField(null=True, blank=True)
+    rounding = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["owner", "created_at", "id"])]
 
     def __str__(self):
         return f"{self.start_of_shift}-{self.end_of_shift}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the days of the shift are updated only when something changes
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def rules(self) -> dict:
+        return {name: getattr(self, name) for name in engine.RULE_FIELDS}
+
+    def changed(self, fields) -> bool:
+        """If any of the fields is not the same with the db,
+        an instance that was not loaded from the db is always changed"""
+        loaded = getattr(self, "_loaded_values", {})
+        return any(
+            name not in loaded or loaded[name] != getattr(self, name)
+            for name in fields
+        )
+
+
+class WorkDayQuerySet(models.QuerySet):
+    """Queryset with the aggregations used from the calculators"""
+
+    @staticmethod
+    def totals_expressions() -> dict:
+        """Conditional aggregates for every counter of the calculator"""
+        return engine.totals_expressions()
+
+    def totals(self) -> dict:
+        """Return all the counters of the queryset in one query"""
+        return self.aggregate(**self.totals_expressions())
+
+
+class DerivedMinutesField(models.IntegerField):
+    """Minutes computed from the db trigger of the work days,
+    the value is read back with RETURNING after every insert"""
+
+    db_returning = True
+
 
 # TODO: test for unique_together
 class WorkDay(models.Model):
@@ -51,15 +106,177 @@ class WorkDay(models.Model):
     end_of_work = models.TimeField(null=True)
     date = models.DateField()
     created = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     comment = models.TextField(max_length=200, null=True, blank=True)
     owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE)
-    before_work = models.IntegerField(null=True)
-    after_work = models.IntegerField(null=True)
+    # the minutes from the shift, always computed from the db
+    before_work = DerivedMinutesField(null=True)
+    after_work = DerivedMinutesField(null=True)
+
+    objects = WorkDayQuerySet.as_manager()
 
     class Meta:
         ordering = ["date"]
         unique_together = ("owner", "date")
+        indexes = [
+            models.Index(fields=["owner", "updated_at"]),
+            # the totals of a range are read from the index only
+            models.Index(
+                fields=["owner", "date"],
+                include=["day", "before_work", "after_work", "shift"],
+                name="worktime_workday_totals_idx",
+            ),
+            # the normal days of a shift are recomputed when it changes
+            models.Index(
+                fields=["shift"],
+                condition=models.Q(day=0),
+                name="worktime_workday_normal_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return str(self.date)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # keep the stored values so the rollups can apply only the delta
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # the rollup is updated from the signals inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def refresh_derived_minutes(self):
+        """Read the minutes that the db trigger computed on update"""
+        self.refresh_from_db(fields=["before_work", "after_work"])
+
+
+class WorkDayMonth(models.Model):
+    """Monthly rollup of the work days of an owner
+
+    The counters have the same names as the calculator totals
+    and they are kept updated from the WorkDay signals"""
+
+    owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    month = models.DateField()
+    late_for_work = models.IntegerField(default=0)
+    overtime = models.IntegerField(default=0)
+    early_leave = models.IntegerField(default=0)
+    workdays = models.IntegerField(default=0)
+    weekend = models.IntegerField(default=0)
+    times_off = models.IntegerField(default=0)
+    sick_leaves = models.IntegerField(default=0)
+    publick_holidays = models.IntegerField(default=0)
+    job_travel = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["month"]
+        unique_together = ("owner", "month")
+
+    def __str__(self) -> str:
+        return f"{self.owner}-{self.month:%Y-%m}"
+
+
+class Tombstone(models.Model):
+    """A deleted work day or shift, the sync gives it to the clients
+    until it is older than the retention of the tombstones"""
+
+    class Kind(models.TextChoices):
+        WORKDAY = "workday", "Work day"
+        SHIFT = "shift", "Shift"
+
+    owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [models.Index(fields=["owner", "deleted_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.object_id}"
+
+
+class ReportJob(models.Model):
+    """A company wide report that runs in the celery workers"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        primary_key=True,
+        editable=False,
+    )
+
+    owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    from_date = models.DateField()
+    to_date = models.DateField()
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    file = models.FileField(upload_to="reports/", null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.from_date}-{self.to_date} {self.status}"
+
+
+class ImportJob(models.Model):
+    """Import of historic timesheets that runs in the celery workers"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        primary_key=True,
+        editable=False,
+    )
+
+    # who uploaded the file, the imports of the command have no owner
+    owner = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    file = models.FileField(upload_to="imports/")
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    processed = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors_file = models.FileField(upload_to="imports/", null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.file.name} {self.status}"
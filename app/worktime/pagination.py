@@ -0,0 +1,21 @@
+"""Keyset pagination of the worktime lists"""
+
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """The cursor is the position of the last row, the next page is
+    read from the index without offset and without counting the table"""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class WorkDayPagination(KeysetPagination):
+    ordering = ("date", "id")
+
+
+class ShiftPagination(KeysetPagination):
+    ordering = ("created_at", "id")
@@ -0,0 +1,26 @@
+"""Recompute the derived minutes of the work days of a shift"""
+import time
+
+from django.db.models import F
+from django.db.models.functions import Now
+
+from worktime.cache import bump_version_on_commit
+from worktime.models import WorkDay
+from worktime.rollup import rebuild_months
+
+
+def recompute_shift_minutes(shift) -> tuple:
+    """Update before_work/after_work of the normal days of the shift
+    with one statement and rebuild their rollups, the statement only
+    touches the rows and the db trigger computes the minutes
+
+    Returns the rows touched and the elapsed seconds"""
+    started = time.perf_counter()
+    rows = WorkDay.objects.filter(shift=shift, day=0).update(
+        start_of_work=F("start_of_work"),
+        updated_at=Now(),
+    )
+    rebuild_months(WorkDay.objects.filter(shift=shift))
+    bump_version_on_commit(shift.owner_id)
+
+    return rows, time.perf_counter() - started
@@ -0,0 +1,139 @@
+"""Helpers that keep the monthly rollups of the work days updated"""
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from worktime.models import WorkDay, WorkDayMonth
+
+COUNTERS = list(WorkDay.objects.totals_expressions())
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def apply_delta(owner_id, month: date, delta: dict, sign: int = 1) -> None:
+    """Add (or subtract with sign=-1) the delta to the month of the owner"""
+    if not delta:
+        return
+
+    if sign > 0:
+        WorkDayMonth.objects.get_or_create(owner_id=owner_id, month=month)
+
+    # on subtract we never create rows, the owner may be deleting
+    WorkDayMonth.objects.filter(owner_id=owner_id, month=month).update(
+        **{key: F(key) + sign * value for key, value in delta.items()}
+    )
+
+
+def subtract_days(queryset) -> None:
+    """Remove the days of the queryset from their month rollups,
+    one update per month instead of one per day"""
+    for row in _month_rows(queryset):
+        apply_delta(row.pop("owner_id"), row.pop("month"), row, sign=-1)
+
+
+def _month_rows(queryset):
+    return (
+        queryset.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("owner_id", "month")
+        .annotate(**WorkDay.objects.totals_expressions())
+    )
+
+
+@transaction.atomic(savepoint=False)
+def rebuild_months(queryset=None) -> int:
+    """Recompute the rollups of the work days in the queryset
+
+    Only the (owner, month) pairs of the queryset are rebuilt,
+    with None every rollup is rebuilt from scratch."""
+    if queryset is None:
+        WorkDayMonth.objects.all().delete()
+        months = WorkDayMonth.objects.bulk_create(
+            (WorkDayMonth(**row) for row in _month_rows(WorkDay.objects.all())),
+            batch_size=1000,
+        )
+        return len(months)
+
+    pairs = set(
+        queryset.annotate(month=TruncMonth("date"))
+        .values_list("owner_id", "month")
+        .distinct()
+    )
+    if not pairs:
+        return 0
+
+    # the month rows are locked before the days are summed, a concurrent
+    # rebuild of the same month waits and then sums the committed days
+    WorkDayMonth.objects.bulk_create(
+        [WorkDayMonth(owner_id=owner_id, month=month) for owner_id, month in pairs],
+        ignore_conflicts=True,
+    )
+    days, months = Q(), Q()
+    for owner_id, month in pairs:
+        days |= Q(owner_id=owner_id, date__gte=month, date__lt=next_month(month))
+        months |= Q(owner_id=owner_id, month=month)
+    list(
+        WorkDayMonth.objects.filter(months)
+        .order_by("owner_id", "month")
+        .select_for_update()
+        .values_list("pk", flat=True)
+    )
+
+    totals = {
+        (row.pop("owner_id"), row.pop("month")): row
+        for row in _month_rows(WorkDay.objects.filter(days)).iterator()
+    }
+    WorkDayMonth.objects.bulk_create(
+        [
+            WorkDayMonth(
+                owner_id=owner_id,
+                month=month,
+                **totals.get((owner_id, month), dict.fromkeys(COUNTERS, 0)),
+            )
+            for owner_id, month in pairs
+        ],
+        update_conflicts=True,
+        unique_fields=["owner", "month"],
+        update_fields=COUNTERS,
+    )
+    return len(pairs)
+
+
+def totals(owner, start: date, end: date) -> dict:
+    """Calculator totals, the whole months come from the rollups
+    and only the days of the partial months at the edges are scanned"""
+    first_full = start if start.day == 1 else next_month(start)
+    if (end + timedelta(days=1)).day == 1:
+        end_full = next_month(end)
+    else:
+        end_full = month_start(end)
+
+    if first_full >= end_full:
+        return WorkDay.objects.filter(
+            owner=owner, date__gte=start, date__lte=end
+        ).totals()
+
+    data = {key: 0 for key in COUNTERS}
+    if start < first_full or end_full <= end:
+        edges = WorkDay.objects.filter(
+            Q(date__gte=start, date__lt=first_full)
+            | Q(date__gte=end_full, date__lte=end),
+            owner=owner,
+        ).totals()
+        data.update(edges)
+
+    months = WorkDayMonth.objects.filter(
+        owner=owner, month__gte=first_full, month__lt=end_full
+    ).aggregate(**{key: Sum(key) for key in COUNTERS})
+    for key, value in months.items():
+        data[key] += value or 0
+
+    return data
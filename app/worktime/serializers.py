@@ -1,9 +1,10 @@
 """Serializers for the work time app"""
 
+import uuid
+from django.db import IntegrityError
 from rest_framework import serializers
-from functools import partial
-from datetime import date, datetime
-from worktime.models import Shift, WorkDay
+from rest_framework.settings import api_settings
+from worktime.models import ReportJob, Shift, Tombstone, WorkDay
 
 
 class ShiftSerializer(serializers.ModelSerializer):
@@ -11,7 +12,16 @@ class ShiftSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Shift
-        fields = ["start_of_shift", "end_of_shift", "id"]
+        fields = [
+            "start_of_shift",
+            "end_of_shift",
+            "id",
+            "late_threshold",
+            "early_leave_threshold",
+            "overtime_threshold",
+            "overtime_cap",
+            "rounding",
+        ]
         read_only_fields = ["id"]
 
     def create(self, validated_data):
@@ -20,8 +30,40 @@ class ShiftSerializer(serializers.ModelSerializer):
         return shift
 
 
+class OwnerShiftField(serializers.PrimaryKeyRelatedField):
+    """Shift of the request user, the shifts of the user are loaded
+    once per request and the days are validated from memory"""
+
+    def get_queryset(self):
+        return Shift.objects.filter(owner=self.context["request"].user)
+
+    def get_shifts(self) -> dict:
+        # the importer gives the shifts of the owner of every row
+        shifts = self.context.get("shifts")
+        if shifts is not None:
+            return shifts
+
+        request = self.context["request"]
+        if not hasattr(request, "owner_shifts"):
+            request.owner_shifts = {shift.pk: shift for shift in self.get_queryset()}
+        return request.owner_shifts
+
+    def to_internal_value(self, data):
+        try:
+            pk = uuid.UUID(str(data))
+        except ValueError:
+            self.fail("does_not_exist", pk_value=data)
+
+        shift = self.get_shifts().get(pk)
+        if shift is None:
+            self.fail("does_not_exist", pk_value=data)
+        return shift
+
+
 # TODO: test for UniqueTogetherValidator
 class WorkDaySerializer(serializers.ModelSerializer):
+    shift = OwnerShiftField()
+
     class Meta:
         model = WorkDay
         fields = [
@@ -35,37 +77,75 @@ class WorkDaySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
+    def get_fields(self):
+        # the list can ask for a part of the fields with ?fields=
+        fields = super().get_fields()
+        names = self.context.get("fields")
+        if names:
+            return {name: field for name, field in fields.items() if name in names}
+
+        return fields
+
     def create(self, validated_data):
-        if validated_data["day"] == 0:
-            date_today = date.today()
-            date_func = partial(
-                datetime.combine,
-                date_today,
+        try:
+            data = WorkDay.objects.create(
+                **validated_data,
+                owner=self.context["request"].user,
             )
-            shift = validated_data["shift"]
-            start_of_work = validated_data.get("start_of_work")
-            end_of_work = validated_data.get("end_of_work")
-            before_work = date_func(start_of_work) - date_func(shift.start_of_shift)
-            after = date_func(end_of_work) - date_func(shift.end_of_shift)
-            validated_data["before_work"] = int(before_work.total_seconds() / 60)
-            validated_data["after_work"] = int(after.total_seconds() / 60)
-
-        data = WorkDay.objects.create(
-            **validated_data,
-            owner=self.context["request"].user,
-        )
+        except IntegrityError:
+            raise self.date_conflict()
         return data
 
-    def validate(self, data):
+    def update(self, instance, validated_data):
+        """Write only the changed fields, the db computes the minutes
+        and the rollups move by the delta of the day"""
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+
+        try:
+            instance.save(update_fields=[*validated_data, "updated_at"])
+        except IntegrityError:
+            raise self.date_conflict()
+        return instance
+
+    def date_conflict(self):
+        # the same date was written meanwhile from another request
+        return serializers.ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    "Please Select another Date This already exists"
+                ]
+            }
+        )
+
+    def date_exists(self, day) -> bool:
+        """The bulk create gives the dates of the owner in the context"""
+        if self.instance is not None and self.instance.date == day:
+            return False
+
+        existing = self.context.get("existing_dates")
+        if existing is not None:
+            return day in existing
+
         user = self.context["request"].user
-        start = data.get("start_of_work")
-        end = data.get("end_of_work")
-        if WorkDay.objects.filter(owner=user, date=data["date"]).exists():
+        return WorkDay.objects.filter(owner=user, date=day).exists()
+
+    def validate(self, data):
+        # a partial update is validated with the values of the day
+        values = {
+            "day": getattr(self.instance, "day", None),
+            "start_of_work": getattr(self.instance, "start_of_work", None),
+            "end_of_work": getattr(self.instance, "end_of_work", None),
+        }
+        values.update(data)
+        start = values["start_of_work"]
+        end = values["end_of_work"]
+        if "date" in data and self.date_exists(data["date"]):
             raise serializers.ValidationError(
                 "Please Select another Date This already exists"
             )
 
-        day = data.get("day")
+        day = values["day"]
         if day == 0 and (start is None or end is None):
             raise serializers.ValidationError(
                 "Normal day should have (start of work) and (end of work)"
@@ -80,6 +160,41 @@ class WorkDaySerializer(serializers.ModelSerializer):
         return super().validate(data)
 
 
+class WorkDayUpsertSerializer(WorkDaySerializer):
+    """Create or replace the day of a date, the date comes from the url"""
+
+    class Meta(WorkDaySerializer.Meta):
+        read_only_fields = ["id", "date"]
+
+    def date_exists(self, day) -> bool:
+        return False
+
+    def validate(self, data):
+        data["date"] = self.context["date"]
+        return super().validate(data)
+
+    def save(self, **kwargs):
+        """Insert or update the day with one statement"""
+        user = self.context["request"].user
+        day = WorkDay(**self.validated_data, owner=user)
+        WorkDay.objects.bulk_create(
+            [day],
+            update_conflicts=True,
+            unique_fields=["owner", "date"],
+            update_fields=[
+                "day",
+                "start_of_work",
+                "end_of_work",
+                "comment",
+                "shift",
+                "updated_at",
+            ],
+        )
+        # the row of the conflict keeps its id and the db computed the minutes
+        self.instance = WorkDay.objects.get(owner=user, date=day.date)
+        return self.instance
+
+
 # TODO: later delete this serializers it no need at all
 class WorkDayDetailsSerializer(WorkDaySerializer):
     class Meta(WorkDaySerializer.Meta):
@@ -91,3 +206,126 @@ class WorkCaclulatorSerializer(serializers.Serializer):
 
     from_date = serializers.DateField()
     to_date = serializers.DateField()
+
+
+class TeamCalculatorSerializer(WorkCaclulatorSerializer):
+    """Calculate the work time of many employees,
+    users is a list of user ids or "all" """
+
+    users = serializers.JSONField(default="all")
+
+    def validate_users(self, value):
+        if value == "all":
+            return None
+
+        field = serializers.ListField(child=serializers.UUIDField(), min_length=1)
+        return field.run_validation(value)
+
+    def validate(self, data):
+        if data["from_date"] > data["to_date"]:
+            raise serializers.ValidationError("from_date must be before to_date")
+
+        return super().validate(data)
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """Optional from/to query params of the worktime lists"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # from is a python keyword, so the fields are added here
+        fields["from"] = serializers.DateField(required=False)
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, data):
+        if "from" in data and "to" in data and data["from"] > data["to"]:
+            raise serializers.ValidationError("from must be before to")
+
+        return super().validate(data)
+
+
+class WorkDayListSerializer(DateRangeSerializer):
+    """Query params of the work days list,
+    fields is a comma separated list of the fields of the days"""
+
+    day = serializers.ChoiceField(WorkDay.VOTES, required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # fields is a property of the serializer, so the field is added here
+        fields["fields"] = serializers.CharField(required=False)
+        return fields
+
+    def validate_fields(self, value):
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = set(names) - set(WorkDaySerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+        return names
+
+
+class WorkDayExportSerializer(DateRangeSerializer):
+    """Query params of the work days export"""
+
+    format = serializers.ChoiceField(["csv", "ndjson"], default="csv")
+    users = serializers.ChoiceField(["me", "all"], default="me")
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Company wide report job"""
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "id",
+            "from_date",
+            "to_date",
+            "status",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "id",
+            "status",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+
+    def validate(self, data):
+        if data["from_date"] > data["to_date"]:
+            raise serializers.ValidationError("from_date must be before to_date")
+
+        return super().validate(data)
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return ReportJob.objects.create(**validated_data, owner=user)
+
+
+class SeriesSerializer(DateRangeSerializer):
+    """Query params of the attendance series"""
+
+    bucket = serializers.ChoiceField(["day", "week", "month"], default="day")
+
+
+class SyncSerializer(serializers.Serializer):
+    """Query params of the delta sync, without since it is a full sync"""
+
+    since = serializers.DateTimeField(required=False)
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """A deleted work day or shift of the delta sync"""
+
+    type = serializers.CharField(source="kind")
+    id = serializers.UUIDField(source="object_id")
+
+    class Meta:
+        model = Tombstone
+        fields = ["type", "id", "deleted_at"]
@@ -0,0 +1,195 @@
+"""
+Signals for worktime models
+"""
+
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from worktime.cache import bump_version_on_commit
+from worktime.engine import RULE_FIELDS, contribution
+from worktime.models import Shift, Tombstone, WorkDay
+from worktime.recompute import recompute_shift_minutes
+from worktime.rollup import (
+    apply_delta,
+    month_start,
+    rebuild_months,
+    subtract_days,
+)
+from worktime.tasks import recompute_shift_minutes_task
+
+SNAPSHOT_FIELDS = [
+    "owner_id",
+    "shift_id",
+    "date",
+    "day",
+    "before_work",
+    "after_work",
+]
+
+
+def get_shift(shift_id, instance):
+    """The shift of the work day, without a query when it is loaded"""
+    if WorkDay.shift.is_cached(instance) and instance.shift_id == shift_id:
+        return instance.shift
+
+    return Shift.objects.only(*RULE_FIELDS).get(pk=shift_id)
+
+
+def deleted_model(origin):
+    """The model whose delete started the delete of the instance"""
+    return getattr(origin, "model", type(origin))
+
+
+def refresh_derived_minutes(sender, instance, created, **kwargs):
+    """The insert returns the minutes, the update needs to read them"""
+    if not created:
+        instance.refresh_derived_minutes()
+
+
+def update_rollup_on_save(sender, instance, created, **kwargs):
+    """Move the contribution of the work day to its month rollup"""
+    old = getattr(instance, "_loaded_values", {})
+    if not created and not all(key in old for key in SNAPSHOT_FIELDS):
+        # loaded with deferred fields, we don't know the old values
+        rebuild_months(WorkDay.objects.filter(pk=instance.pk))
+    else:
+        if not created:
+            apply_delta(
+                old["owner_id"],
+                month_start(old["date"]),
+                contribution(
+                    old["day"],
+                    old["before_work"],
+                    old["after_work"],
+                    get_shift(old["shift_id"], instance),
+                ),
+                sign=-1,
+            )
+        apply_delta(
+            instance.owner_id,
+            month_start(instance.date),
+            contribution(
+                instance.day,
+                instance.before_work,
+                instance.after_work,
+                instance.shift,
+            ),
+        )
+
+    instance._loaded_values = {
+        key: getattr(instance, key) for key in SNAPSHOT_FIELDS
+    }
+
+
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    """Remove the contribution of the work day from its month rollup,
+    the days deleted with their shift or owner are handled there"""
+    if not issubclass(deleted_model(origin), WorkDay):
+        return
+
+    apply_delta(
+        instance.owner_id,
+        month_start(instance.date),
+        contribution(
+            instance.day,
+            instance.before_work,
+            instance.after_work,
+            get_shift(instance.shift_id, instance),
+        ),
+        sign=-1,
+    )
+
+
+def update_rollup_on_shift_delete(sender, instance, origin=None, **kwargs):
+    """Remove the days of the shift from the rollups once per month,
+    the rollups of a deleted owner are deleted with it"""
+    if issubclass(deleted_model(origin), get_user_model()):
+        return
+
+    subtract_days(WorkDay.objects.filter(shift=instance))
+
+
+def update_days_on_shift_change(sender, instance, created, **kwargs):
+    """The days of the shift follow the new times and rules,
+    the shifts with many days are recomputed in the workers"""
+    if not created:
+        if instance.changed(["start_of_shift", "end_of_shift"]):
+            days = WorkDay.objects.filter(shift=instance, day=0).count()
+            if days > settings.WORKTIME_RECOMPUTE_ASYNC_ROWS:
+                shift_id = str(instance.pk)
+                transaction.on_commit(
+                    lambda: recompute_shift_minutes_task.delay(shift_id)
+                )
+            else:
+                recompute_shift_minutes(instance)
+        elif instance.changed(RULE_FIELDS):
+            rebuild_months(WorkDay.objects.filter(shift=instance))
+
+    instance._loaded_values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+    }
+
+
+post_save.connect(refresh_derived_minutes, sender=WorkDay)
+post_save.connect(update_rollup_on_save, sender=WorkDay)
+post_delete.connect(update_rollup_on_delete, sender=WorkDay)
+pre_delete.connect(update_rollup_on_shift_delete, sender=Shift)
+post_save.connect(update_days_on_shift_change, sender=Shift)
+
+
+def invalidate_owner_cache(sender, instance, **kwargs):
+    """Every change of the owner data invalidates the cached results"""
+    bump_version_on_commit(instance.owner_id)
+
+
+post_save.connect(invalidate_owner_cache, sender=WorkDay)
+post_delete.connect(invalidate_owner_cache, sender=WorkDay)
+post_save.connect(invalidate_owner_cache, sender=Shift)
+post_delete.connect(invalidate_owner_cache, sender=Shift)
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Keep the deleted days for the delta sync,
+    the days deleted with their shift or owner are handled there"""
+    if not issubclass(deleted_model(origin), WorkDay):
+        return
+
+    Tombstone.objects.create(
+        owner_id=instance.owner_id,
+        kind=Tombstone.Kind.WORKDAY,
+        object_id=instance.pk,
+    )
+
+
+def record_shift_tombstones(sender, instance, origin=None, **kwargs):
+    """Keep the deleted shift and its days in one insert,
+    nothing is kept when the owner itself is deleted"""
+    if issubclass(deleted_model(origin), get_user_model()):
+        return
+
+    days = WorkDay.objects.filter(shift=instance).values_list("pk", "owner_id")
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                owner_id=instance.owner_id,
+                kind=Tombstone.Kind.SHIFT,
+                object_id=instance.pk,
+            ),
+            *(
+                Tombstone(
+                    owner_id=owner_id,
+                    kind=Tombstone.Kind.WORKDAY,
+                    object_id=pk,
+                )
+                for pk, owner_id in days
+            ),
+        ]
+    )
+
+
+post_delete.connect(record_tombstone, sender=WorkDay)
+pre_delete.connect(record_shift_tombstones, sender=Shift)
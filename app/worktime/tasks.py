@@ -0,0 +1,125 @@
+"""Celery tasks of the worktime reports"""
+import csv
+import io
+
+from datetime import timedelta
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from worktime.importer import run_import
+from worktime.models import ImportJob, ReportJob, Shift, Tombstone, WorkDay
+from worktime.recompute import recompute_shift_minutes
+from worktime.rollup import COUNTERS
+
+REPORT_CHUNK_SIZE = 200
+REPORT_FIELDS = ["user", "email"] + COUNTERS
+
+
+@shared_task
+def start_report(job_id):
+    """Split the owners of the range in chunks and calculate
+    them in parallel, the last task writes the report file"""
+    job = ReportJob.objects.get(pk=job_id)
+    job.status = ReportJob.Status.RUNNING
+    job.save(update_fields=["status"])
+
+    owners = list(
+        WorkDay.objects.filter(date__gte=job.from_date, date__lte=job.to_date)
+        .order_by("owner_id")
+        .values_list("owner_id", flat=True)
+        .distinct()
+    )
+    chunks = [
+        [str(owner) for owner in owners[i : i + REPORT_CHUNK_SIZE]]
+        for i in range(0, len(owners), REPORT_CHUNK_SIZE)
+    ]
+    if not chunks:
+        return finish_report([], str(job.pk))
+
+    from_date, to_date = job.from_date.isoformat(), job.to_date.isoformat()
+    callback = finish_report.s(str(job.pk)).on_error(report_failed.si(str(job.pk)))
+    chord(
+        report_chunk.s(chunk, from_date, to_date) for chunk in chunks
+    )(callback)
+
+
+@shared_task
+def report_chunk(owners, from_date, to_date):
+    """Calculate the totals of some owners with one grouped query"""
+    rows = (
+        WorkDay.objects.filter(
+            owner_id__in=owners,
+            date__gte=from_date,
+            date__lte=to_date,
+        )
+        .order_by("owner_id")
+        .values_list("owner_id", "owner__email")
+        .annotate(**WorkDay.objects.totals_expressions())
+    )
+    return [[str(row[0]), *row[1:]] for row in rows]
+
+
+@shared_task
+def finish_report(results, job_id):
+    """Write the rows of all the chunks in the report file"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_FIELDS)
+    for rows in results:
+        writer.writerows(rows)
+
+    job = ReportJob.objects.get(pk=job_id)
+    job.file.save(f"{job.pk}.csv", ContentFile(buffer.getvalue()), save=False)
+    job.status = ReportJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "finished_at"])
+
+
+@shared_task
+def report_failed(job_id):
+    ReportJob.objects.filter(pk=job_id).update(
+        status=ReportJob.Status.FAILED,
+        error="The report failed, please try again",
+        finished_at=timezone.now(),
+    )
+
+
+@shared_task
+def recompute_shift_minutes_task(shift_id):
+    """Recompute the minutes of a shift with many work days"""
+    shift = Shift.objects.get(pk=shift_id)
+    with transaction.atomic():
+        rows, elapsed = recompute_shift_minutes(shift)
+
+    return {"rows": rows, "elapsed": elapsed}
+
+
+@shared_task
+def import_workdays(job_id):
+    """Import the timesheets file of the job in batches"""
+    job = ImportJob.objects.get(pk=job_id)
+    try:
+        run_import(job)
+    except Exception as error:
+        ImportJob.objects.filter(pk=job_id).update(
+            status=ImportJob.Status.FAILED,
+            error=str(error),
+            finished_at=timezone.now(),
+        )
+        raise
+
+
+@shared_task
+def purge_tombstones():
+    """Delete the tombstones older than the retention,
+    the clients that synced before it make a full sync"""
+    retention = timedelta(days=settings.WORKTIME_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = Tombstone.objects.filter(
+        deleted_at__lt=timezone.now() - retention,
+    ).delete()
+
+    return {"deleted": deleted}
@@ -1,8 +1,9 @@
-from datetime import time, date
+from datetime import date, datetime, time, timedelta
 from django.contrib.auth import get_user_model
 import pytest
 from rest_framework.test import APIClient
 
+from accounts.models import Permissions
 from worktime.models import Shift
 
 
@@ -69,3 +70,30 @@ def payload_workday(shift):
         "date": dat,
         "shift": shift.id,
     }
+
+
+@pytest.fixture
+def admin_api_client(create_user):
+    """Api client force authenticate with an admin user"""
+    user = create_user(email="admin@example.com")
+    perm, created = Permissions.objects.get_or_create(name="admin")
+    user.permissions.add(perm)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def work_times():
+    """Times of work that are before_work/after_work minutes from the shift"""
+
+    def _work_times(shift, before_work, after_work):
+        day = date.today()
+        start = datetime.combine(day, shift.start_of_shift)
+        end = datetime.combine(day, shift.end_of_shift)
+        return {
+            "start_of_work": (start + timedelta(minutes=before_work)).time(),
+            "end_of_work": (end + timedelta(minutes=after_work)).time(),
+        }
+
+    return _work_times
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import Shift, WorkDay, WorkDayMonth
+
+pytestmark = pytest.mark.django_db
+
+BULK_URL = reverse("worktime:workday-bulk")
+
+
+def month_payload(shift, days):
+    return [
+        {
+            "day": 0,
+            "start_of_work": "08:10",
+            "end_of_work": "17:00",
+            "date": str(date(2022, 3, 1) + timedelta(days=i)),
+            "shift": str(shift.id),
+        }
+        for i in range(days)
+    ]
+
+
+def test_bulk_create_days(auth_api_client, shift):
+    """Test create a month of days with the minutes and the rollups"""
+    res = auth_api_client.post(BULK_URL, month_payload(shift, 20), format="json")
+
+    assert res.status_code == status.HTTP_201_CREATED
+    assert len(res.data["created"]) == 20
+    assert res.data["errors"] == []
+    assert set(WorkDay.objects.values_list("before_work", "after_work")) == {(10, 30)}
+
+    month = WorkDayMonth.objects.get(owner=shift.owner)
+    assert month.workdays == 20
+    assert month.late_for_work == 200
+
+
+def test_bulk_create_queries_dont_grow(
+    auth_api_client,
+    shift,
+    django_assert_max_num_queries,
+):
+    """Test the queries are the same for 2 and 30 days"""
+    with django_assert_max_num_queries(10) as few:
+        auth_api_client.post(BULK_URL, month_payload(shift, 2), format="json")
+    WorkDay.objects.all().delete()
+
+    with django_assert_max_num_queries(len(few)):
+        auth_api_client.post(BULK_URL, month_payload(shift, 30), format="json")
+
+
+def test_bulk_create_errors_per_item(auth_api_client, shift, create_user):
+    """Test the days with errors are returned and the rest are created"""
+    other = create_user(email="other@example.com")
+    other_shift = Shift.objects.create(
+        start_of_shift="08:00",
+        end_of_shift="16:00",
+        owner=other,
+    )
+    WorkDay.objects.create(owner=shift.owner, shift=shift, date=date(2022, 3, 2), day=1)
+    payload = month_payload(shift, 4)
+    payload[1]["start_of_work"] = "08:00"
+    payload[2]["shift"] = str(other_shift.id)
+    payload[3]["start_of_work"] = None
+    payload.append(dict(payload[0]))
+    payload.append({"date": "wrong"})
+
+    res = auth_api_client.post(BULK_URL, payload, format="json")
+
+    assert res.status_code == status.HTTP_201_CREATED
+    assert [day["date"] for day in res.data["created"]] == ["2022-03-01"]
+    assert [error["index"] for error in res.data["errors"]] == [1, 2, 3, 4, 5]
+    assert "shift" in res.data["errors"][1]["errors"]
+
+
+def test_bulk_create_not_a_list_should_fail(auth_api_client):
+    res = auth_api_client.post(BULK_URL, {"day": 0}, format="json")
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+import csv
+import io
+import json
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import WorkDay
+
+pytestmark = pytest.mark.django_db
+
+EXPORT_URL = reverse("worktime:workday-export")
+
+
+@pytest.fixture
+def days(shift):
+    for i in range(10):
+        WorkDay.objects.create(
+            owner=shift.owner,
+            shift=shift,
+            date=date(2022, 1, 1) + timedelta(days=i),
+            day=1,
+        )
+
+
+def content(res):
+    return b"".join(res.streaming_content).decode()
+
+
+def test_export_unauth_should_fail(client):
+    """Test export without auth"""
+    res = client.get(EXPORT_URL)
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_export_csv(auth_api_client, days):
+    """Test export the work days of the user as csv"""
+    res = auth_api_client.get(
+        EXPORT_URL, {"from": "2022-01-03", "to": "2022-01-05", "format": "csv"}
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res["Content-Type"] == "text/csv"
+
+    rows = list(csv.DictReader(io.StringIO(content(res))))
+    assert [row["date"] for row in rows] == [
+        "2022-01-03",
+        "2022-01-04",
+        "2022-01-05",
+    ]
+    assert rows[0]["owner__email"] == "John.Doe@example.com"
+
+
+def test_export_ndjson(auth_api_client, days):
+    """Test export the work days of the user as ndjson"""
+    res = auth_api_client.get(EXPORT_URL, {"format": "ndjson"})
+    assert res.status_code == status.HTTP_200_OK
+
+    rows = [json.loads(line) for line in content(res).splitlines()]
+    assert len(rows) == 10
+    assert rows[0]["date"] == "2022-01-01"
+
+
+def test_export_other_users_are_hidden(auth_api_client, create_user, days):
+    """Test the export has only the days of the user"""
+    other = create_user(email="other@example.com")
+    day = WorkDay.objects.first()
+    WorkDay.objects.create(owner=other, shift=day.shift, date=day.date, day=1)
+
+    res = auth_api_client.get(EXPORT_URL, {"format": "ndjson"})
+    assert len(content(res).splitlines()) == 10
+
+
+def test_export_all_users_not_admin_should_fail(auth_api_client):
+    """Test simple users can't export all the users"""
+    res = auth_api_client.get(EXPORT_URL, {"users": "all"})
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_export_all_users_admin(admin_api_client, days):
+    """Test admins export all the users"""
+    res = admin_api_client.get(EXPORT_URL, {"users": "all", "format": "ndjson"})
+    assert res.status_code == status.HTTP_200_OK
+    assert len(content(res).splitlines()) == 10
+
+
+def test_export_wrong_range_should_fail(auth_api_client):
+    """Test from after to should fail"""
+    res = auth_api_client.get(EXPORT_URL, {"from": "2022-02-01", "to": "2022-01-01"})
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import WorkDay
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+
+
+@pytest.fixture
+def days(shift):
+    """Weekends and days off from the 20th of march to the 9th of april"""
+    start = date(2020, 3, 20)
+    return WorkDay.objects.bulk_create(
+        WorkDay(
+            owner=shift.owner,
+            shift=shift,
+            date=start + timedelta(days=i),
+            day=1 if i % 2 else 2,
+            comment="a long comment",
+        )
+        for i in range(21)
+    )
+
+
+def test_list_from_to(auth_api_client, days):
+    """Test only the days of the range are listed"""
+    res = auth_api_client.get(WORKDAY_URL, {"from": "2020-04-01", "to": "2020-04-05"})
+
+    assert res.status_code == status.HTTP_200_OK
+    dates = [row["date"] for row in res.data["results"]]
+    assert dates == [f"2020-04-0{i}" for i in range(1, 6)]
+
+
+def test_list_day(auth_api_client, days):
+    """Test the days are filtered by the type of the day"""
+    res = auth_api_client.get(WORKDAY_URL, {"day": 1})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert len(res.data["results"]) == 10
+    assert {row["day"] for row in res.data["results"]} == {1}
+
+
+def test_list_fields(auth_api_client, days):
+    """Test the rows and the select have only the asked fields"""
+    with CaptureQueriesContext(connection) as context:
+        res = auth_api_client.get(WORKDAY_URL, {"fields": "date,day"})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert set(res.data["results"][0]) == {"date", "day"}
+    select = [
+        query["sql"]
+        for query in context.captured_queries
+        if 'FROM "worktime_workday"' in query["sql"]
+    ]
+    assert len(select) == 1
+    assert '"comment"' not in select[0]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"fields": "date,owner"},
+        {"day": 9},
+        {"from": "2020-04-05", "to": "2020-04-01"},
+    ],
+)
+def test_list_bad_params_should_fail(auth_api_client, days, params):
+    res = auth_api_client.get(WORKDAY_URL, params)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
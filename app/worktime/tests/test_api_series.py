@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from worktime.models import WorkDay
+
+pytestmark = pytest.mark.django_db
+
+SERIES_URL = reverse("worktime:series")
+
+
+@pytest.fixture
+def days(shift, work_times):
+    """Work days from 2022-01-01 to 2022-03-31, weekends are day 1"""
+    day = date(2022, 1, 1)
+    while day <= date(2022, 3, 31):
+        WorkDay.objects.create(
+            owner=shift.owner,
+            shift=shift,
+            date=day,
+            day=1 if day.weekday() >= 5 else 0,
+            **work_times(shift, 1, 0),
+        )
+        day += timedelta(days=1)
+
+
+def test_series_unauth_should_fail():
+    res = APIClient().get(SERIES_URL)
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_series_per_month(auth_api_client, days, django_assert_num_queries):
+    """Test the series has one row per month from one query"""
+    with django_assert_num_queries(1):
+        res = auth_api_client.get(SERIES_URL, {"bucket": "month"})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [row["bucket"] for row in res.data] == [
+        date(2022, 1, 1),
+        date(2022, 2, 1),
+        date(2022, 3, 1),
+    ]
+    assert res.data[1]["workdays"] == 20
+    assert res.data[1]["weekend"] == 8
+    assert res.data[1]["late_for_work"] == 20
+
+
+def test_series_per_week_in_range(auth_api_client, days):
+    """Test the weeks of the range start on monday"""
+    res = auth_api_client.get(
+        SERIES_URL, {"bucket": "week", "from": "2022-01-03", "to": "2022-01-16"}
+    )
+
+    assert [row["bucket"] for row in res.data] == [
+        date(2022, 1, 3),
+        date(2022, 1, 10),
+    ]
+    assert all(row["workdays"] == 5 for row in res.data)
+
+
+def test_series_wrong_bucket_should_fail(auth_api_client):
+    res = auth_api_client.get(SERIES_URL, {"bucket": "hour"})
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
@@ -112,7 +112,7 @@ def test_get_shift_list_with_differnt_user_should_fail(create_user, auth_api_cli
 
     res = auth_api_client.get(SHIFT_URL)
     assert res.status_code == status.HTTP_200_OK
-    assert len(res.data) == 0
+    assert len(res.data["results"]) == 0
 
 
 def test_get_shift_list(auth_api_client):
@@ -128,7 +128,7 @@ def test_get_shift_list(auth_api_client):
 
     res = auth_api_client.get(SHIFT_URL)
     assert res.status_code == status.HTTP_200_OK
-    assert len(res.data) == 3
+    assert len(res.data["results"]) == 3
 
 
 def test_get_shift_details(auth_api_client):
@@ -159,9 +159,9 @@ def test_delete_shift(auth_api_client):
 
     res = auth_api_client.get(SHIFT_URL)
     assert res.status_code == status.HTTP_200_OK
-    assert len(res.data) == 3
+    assert len(res.data["results"]) == 3
     del_item = auth_api_client.delete(shift_url_details(shift.id))
     assert del_item.status_code == status.HTTP_204_NO_CONTENT
     res = auth_api_client.get(SHIFT_URL)
     assert res.status_code == status.HTTP_200_OK
-    assert len(res.data) == 2
+    assert len(res.data["results"]) == 2
@@ -0,0 +1,128 @@
+from datetime import date, time
+import json
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import Shift, WorkDay
+
+pytestmark = pytest.mark.django_db
+
+TEAM_URL = reverse("worktime:team_calc")
+
+
+@pytest.fixture
+def team(create_user, work_times):
+    """Three users with one late and one weekend day each"""
+    users = []
+    for i in range(3):
+        user = create_user(email=f"user{i}@example.com")
+        shift = Shift.objects.create(
+            start_of_shift=time(8, 0),
+            end_of_shift=time(16, 0),
+            owner=user,
+        )
+        WorkDay.objects.create(
+            owner=user,
+            shift=shift,
+            date=date(2022, 5, 2),
+            day=0,
+            **work_times(shift, i + 1, 0),
+        )
+        WorkDay.objects.create(owner=user, shift=shift, date=date(2022, 5, 7), day=1)
+        users.append(user)
+
+    return users
+
+
+def get_json(res):
+    return json.loads(b"".join(res.streaming_content))
+
+
+def test_team_calc_not_admin_should_fail(auth_api_client):
+    """Test simple users can't see the team totals"""
+    res = auth_api_client.post(TEAM_URL, {})
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_team_calc_all_users(admin_api_client, team, django_assert_num_queries):
+    """Test all users are calculated with one grouped query"""
+    payload = {"from_date": date(2022, 5, 1), "to_date": date(2022, 5, 31)}
+
+    # the permissions of the admin are in the user, only the grouped query
+    with django_assert_num_queries(1):
+        res = admin_api_client.post(TEAM_URL, payload, format="json")
+        data = get_json(res)
+
+    assert res.status_code == status.HTTP_200_OK
+    totals = {row["email"]: row for row in data}
+    assert len(totals) == 3
+    for i, user in enumerate(team):
+        assert totals[user.email]["user"] == str(user.id)
+        assert totals[user.email]["late_for_work"] == i + 1
+        assert totals[user.email]["workdays"] == 1
+        assert totals[user.email]["weekend"] == 1
+
+
+def test_team_calc_selected_users(admin_api_client, team):
+    """Test only the selected users are calculated"""
+    payload = {
+        "from_date": date(2022, 5, 1),
+        "to_date": date(2022, 5, 5),
+        "users": [str(team[0].id), str(team[2].id)],
+    }
+    res = admin_api_client.post(TEAM_URL, payload, format="json")
+    data = get_json(res)
+
+    assert {row["user"] for row in data} == {str(team[0].id), str(team[2].id)}
+    assert all(row["weekend"] == 0 for row in data)
+
+
+def test_team_calc_selected_users_without_days(admin_api_client, team):
+    """Test the selected users without days in the range have zero totals"""
+    payload = {
+        "from_date": date(2022, 5, 3),
+        "to_date": date(2022, 5, 6),
+        "users": [str(user.id) for user in team],
+    }
+    res = admin_api_client.post(TEAM_URL, payload, format="json")
+    data = get_json(res)
+
+    assert sorted(row["email"] for row in data) == [user.email for user in team]
+    for row in data:
+        assert row["workdays"] == row["late_for_work"] == row["weekend"] == 0
+
+
+def test_team_calc_mixed_users(admin_api_client, team, create_user):
+    """Test the users with and without days are given in the id order"""
+    idle = create_user(email="idle@example.com")
+    users = sorted([team[0].id, team[1].id, idle.id])
+    payload = {
+        "from_date": date(2022, 5, 1),
+        "to_date": date(2022, 5, 31),
+        "users": [str(pk) for pk in users],
+    }
+    res = admin_api_client.post(TEAM_URL, payload, format="json")
+    data = get_json(res)
+
+    assert [row["user"] for row in data] == [str(pk) for pk in users]
+    totals = {row["email"]: row["workdays"] for row in data}
+    assert totals == {team[0].email: 1, team[1].email: 1, idle.email: 0}
+
+
+def test_team_calc_from_after_to_should_fail(admin_api_client):
+    """Test the range must start before it ends"""
+    payload = {"from_date": date(2022, 5, 5), "to_date": date(2022, 5, 1)}
+    res = admin_api_client.post(TEAM_URL, payload, format="json")
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_team_calc_invalid_users_should_fail(admin_api_client):
+    """Test users must be "all" or a list of ids"""
+    payload = {
+        "from_date": date(2022, 5, 1),
+        "to_date": date(2022, 5, 5),
+        "users": ["not-an-id"],
+    }
+    res = admin_api_client.post(TEAM_URL, payload, format="json")
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
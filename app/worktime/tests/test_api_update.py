@@ -0,0 +1,125 @@
+from datetime import date, time
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import WorkDay, WorkDayMonth
+from worktime.serializers import WorkDaySerializer
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+
+
+def workday_url_details(id):
+    return reverse("worktime:workday-detail", args=[id])
+
+
+@pytest.fixture
+def work_day(auth_api_client, payload_workday):
+    payload_workday["start_of_work"] = time(8, 10)
+    res = auth_api_client.post(WORKDAY_URL, payload_workday)
+    return WorkDay.objects.get(pk=res.data["id"])
+
+
+def month_of(day):
+    return WorkDayMonth.objects.get(owner=day.owner, month=day.date.replace(day=1))
+
+
+def test_patch_end_of_work(auth_api_client, work_day):
+    """Test patch recomputes the minutes and moves the rollup"""
+    res = auth_api_client.patch(
+        workday_url_details(work_day.id), {"end_of_work": time(17, 0)}
+    )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.data["id"] == str(work_day.id)
+    work_day.refresh_from_db()
+    assert (work_day.before_work, work_day.after_work) == (10, 30)
+    month = month_of(work_day)
+    assert (month.workdays, month.late_for_work, month.overtime) == (1, 10, 30)
+
+
+def test_patch_writes_only_the_changes(auth_api_client, work_day):
+    """Test the update statement has only the patched fields"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        auth_api_client.patch(workday_url_details(work_day.id), {"comment": "ok"})
+
+    updates = [
+        query["sql"]
+        for query in context.captured_queries
+        if query["sql"].startswith('UPDATE "worktime_workday"')
+    ]
+    assert len(updates) == 1
+    assert '"start_of_work"' not in updates[0]
+
+
+def test_patch_date_to_other_month(auth_api_client, work_day):
+    """Test moving the day to another month moves its totals"""
+    old_month = month_of(work_day)
+    res = auth_api_client.patch(
+        workday_url_details(work_day.id), {"date": date(2020, 11, 2)}
+    )
+
+    assert res.status_code == status.HTTP_200_OK
+    old_month.refresh_from_db()
+    assert (old_month.workdays, old_month.late_for_work) == (0, 0)
+    work_day.refresh_from_db()
+    assert month_of(work_day).late_for_work == 10
+
+
+def test_patch_to_existing_date_should_fail(
+    auth_api_client,
+    work_day,
+    payload_workday,
+):
+    """Test the date of the day can't be the date of another day"""
+    payload_workday["date"] = date(2020, 10, 11)
+    auth_api_client.post(WORKDAY_URL, payload_workday)
+
+    res = auth_api_client.patch(
+        workday_url_details(work_day.id), {"date": date(2020, 10, 11)}
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_patch_to_date_taken_meanwhile_should_fail(
+    auth_api_client,
+    work_day,
+    payload_workday,
+    monkeypatch,
+):
+    """Test the date written by another request after the check gives 400"""
+    payload_workday["date"] = date(2020, 10, 11)
+    auth_api_client.post(WORKDAY_URL, payload_workday)
+    monkeypatch.setattr(WorkDaySerializer, "date_exists", lambda self, day: False)
+
+    res = auth_api_client.patch(
+        workday_url_details(work_day.id), {"date": date(2020, 10, 11)}
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert (
+        res.data["non_field_errors"][0]
+        == "Please Select another Date This already exists"
+    )
+
+
+def test_patch_normal_day_without_end_should_fail(auth_api_client, work_day):
+    """Test the partial data is validated with the values of the day"""
+    res = auth_api_client.patch(
+        workday_url_details(work_day.id), {"end_of_work": ""}
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_put_replaces_the_day(auth_api_client, work_day, payload_workday):
+    """Test put with the same date replaces the day"""
+    payload_workday["day"] = 3
+    res = auth_api_client.put(workday_url_details(work_day.id), payload_workday)
+
+    assert res.status_code == status.HTTP_200_OK
+    month = month_of(work_day)
+    assert (month.workdays, month.sick_leaves, month.late_for_work) == (0, 1, 0)
@@ -0,0 +1,99 @@
+from datetime import date
+import pytest
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import WorkDay, WorkDayMonth
+
+pytestmark = pytest.mark.django_db
+
+
+def by_date_url(day):
+    return reverse("worktime:workday-by-date", args=[day])
+
+
+@pytest.fixture
+def payload(shift):
+    return {
+        "day": 0,
+        "start_of_work": "08:10",
+        "end_of_work": "16:30",
+        "shift": shift.id,
+    }
+
+
+def test_upsert_creates_day(auth_api_client, payload, shift):
+    """Test put on a new date creates the day"""
+    res = auth_api_client.put(by_date_url("2022-05-02"), payload)
+
+    assert res.status_code == status.HTTP_200_OK
+    day = WorkDay.objects.get(owner=shift.owner)
+    assert str(day.id) == res.data["id"]
+    assert day.date == date(2022, 5, 2)
+    assert day.before_work == 10
+
+
+def test_upsert_replaces_day(auth_api_client, payload, shift):
+    """Test put on an existing date updates it in place"""
+    first = auth_api_client.put(by_date_url("2022-05-02"), payload)
+    payload["start_of_work"] = "08:25"
+    payload["end_of_work"] = "17:00"
+    res = auth_api_client.put(by_date_url("2022-05-02"), payload)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.data["id"] == first.data["id"]
+    day = WorkDay.objects.get(owner=shift.owner)
+    assert (day.before_work, day.after_work) == (25, 30)
+
+    month = WorkDayMonth.objects.get(owner=shift.owner)
+    assert (month.workdays, month.late_for_work, month.overtime) == (1, 25, 30)
+
+
+def test_upsert_statement(
+    auth_api_client,
+    payload,
+    shift,
+    django_assert_max_num_queries,
+):
+    """Test the write is one statement without a check of the date"""
+    auth_api_client.put(by_date_url("2022-05-02"), payload)
+
+    with django_assert_max_num_queries(10) as context:
+        auth_api_client.put(by_date_url("2022-05-02"), payload)
+
+    sqls = [query["sql"] for query in context.captured_queries]
+    upserts = [sql for sql in sqls if sql.startswith('INSERT INTO "worktime_workday"')]
+    assert len(upserts) == 1
+    assert "ON CONFLICT" in upserts[0]
+    assert not any("SELECT 1 AS" in sql for sql in sqls)
+
+
+def test_upsert_validates_day(auth_api_client, payload):
+    """Test put validates the day like the create"""
+    payload["end_of_work"] = ""
+    res = auth_api_client.put(by_date_url("2022-05-02"), payload)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_upsert_wrong_date_should_fail(auth_api_client, payload):
+    res = auth_api_client.put(by_date_url("2022-02-30"), payload)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_create_race_returns_validation_error(auth_api_client, payload):
+    """Test a date created meanwhile fails like the duplicate date"""
+    auth_api_client.put(by_date_url("2022-05-02"), payload)
+    payload["date"] = "2022-05-02"
+
+    with patch(
+        "worktime.serializers.WorkDaySerializer.date_exists",
+        return_value=False,
+    ):
+        res = auth_api_client.post(reverse("worktime:workday-list"), payload)
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert (
+        res.data["non_field_errors"][0]
+        == "Please Select another Date This already exists"
+    )
@@ -1,11 +1,13 @@
 from datetime import time
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from worktime.serializers import WorkDayDetailsSerializer, WorkDaySerializer
 
-from worktime.models import WorkDay
+from worktime.models import Shift, WorkDay
 
 
 WORKDAY_URL = reverse("worktime:workday-list")
@@ -62,7 +64,7 @@ def test_get_workday_list_should_succeed(auth_api_client, payload_workday):
     res = auth_api_client.get(WORKDAY_URL)
     assert res.status_code == status.HTTP_200_OK
     for i in ["day", "start_of_work", "end_of_work", "id", "date"]:
-        assert i in res.data[0]
+        assert i in res.data["results"][0]
 
 
 def test_get_details_should_succeed(auth_api_client, payload_workday):
@@ -275,3 +277,54 @@ def test_data_early_leave_from_view_should_succeed(
         "job_travel": 0,
     }
     assert res.data == data
+
+
+def test_calculator_runs_in_one_query(
+    auth_api_client,
+    payload_workday,
+    django_assert_num_queries,
+):
+    """Test the calculator aggregates everything in a single query"""
+    auth_api_client.post(WORKDAY_URL, payload_workday)
+    payload = {
+        "from_date": payload_workday["date"],
+        "to_date": payload_workday["date"],
+    }
+
+    with django_assert_num_queries(1):
+        res = auth_api_client.post(CALCULATOR_URL, payload)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.data["workdays"] == 1
+
+
+def test_calculator_invalid_dates_should_fail(auth_api_client):
+    """Test the calculator with invalid payload"""
+    res = auth_api_client.post(CALCULATOR_URL, {"from_date": "wrong"})
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_post_workday_with_other_user_shift_should_fail(
+    auth_api_client,
+    payload_workday,
+    create_user,
+):
+    """Test the shift should be one of the shifts of the user"""
+    other = create_user(email="other@example.com")
+    shift = Shift.objects.create(
+        start_of_shift=time(8, 0),
+        end_of_shift=time(16, 0),
+        owner=other,
+    )
+    payload_workday["shift"] = shift.id
+    res = auth_api_client.post(WORKDAY_URL, payload_workday)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert "shift" in res.data
+
+
+def test_post_workday_loads_shifts_once(auth_api_client, payload_workday):
+    """Test the shifts of the user are loaded with one query"""
+    with CaptureQueriesContext(connection) as context:
+        auth_api_client.post(WORKDAY_URL, payload_workday)
+
+    sqls = [query["sql"] for query in context.captured_queries]
+    assert sum('FROM "worktime_shift"' in sql for sql in sqls) == 1
@@ -0,0 +1,120 @@
+from datetime import date, time
+import pytest
+from django.db import transaction
+from django.urls import reverse
+
+from worktime import cache
+from worktime.models import Shift, WorkDay
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+CALCULATOR_URL = reverse("worktime:work_calc")
+
+
+@pytest.fixture
+def calc_payload(payload_workday):
+    return {
+        "from_date": payload_workday["date"],
+        "to_date": payload_workday["date"],
+    }
+
+
+def test_same_range_is_served_from_cache(
+    auth_api_client,
+    payload_workday,
+    calc_payload,
+    django_assert_num_queries,
+):
+    """Test the second call of the same range makes no queries"""
+    auth_api_client.post(WORKDAY_URL, payload_workday)
+    before = cache.stats()
+
+    first = auth_api_client.post(CALCULATOR_URL, calc_payload)
+    with django_assert_num_queries(0):
+        second = auth_api_client.post(CALCULATOR_URL, calc_payload)
+
+    after = cache.stats()
+    assert first.data == second.data
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_work_day_change_invalidates_cache(
+    auth_api_client,
+    payload_workday,
+    calc_payload,
+    django_capture_on_commit_callbacks,
+):
+    """Test a new work day is never served stale from the cache"""
+    res = auth_api_client.post(CALCULATOR_URL, calc_payload)
+    assert res.data["workdays"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_api_client.post(WORKDAY_URL, payload_workday)
+    res = auth_api_client.post(CALCULATOR_URL, calc_payload)
+    assert res.data["workdays"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        WorkDay.objects.all().delete()
+    res = auth_api_client.post(CALCULATOR_URL, calc_payload)
+    assert res.data["workdays"] == 0
+
+
+def test_shift_change_bumps_version(shift, django_capture_on_commit_callbacks):
+    """Test a shift change bumps the version of the owner"""
+    version = cache.get_version(shift.owner_id)
+    shift.end_of_shift = time(17, 0)
+    with django_capture_on_commit_callbacks(execute=True):
+        shift.save()
+    assert cache.get_version(shift.owner_id) > version
+
+    version = cache.get_version(shift.owner_id)
+    with django_capture_on_commit_callbacks(execute=True):
+        Shift.objects.create(
+            start_of_shift=time(8, 0),
+            end_of_shift=time(16, 0),
+            owner=shift.owner,
+        )
+    assert cache.get_version(shift.owner_id) > version
+
+
+def test_calc_during_the_write_is_not_cached_as_new(
+    auth_api_client,
+    payload_workday,
+    calc_payload,
+    django_capture_on_commit_callbacks,
+):
+    """Test a calc between the change and its commit can't cache
+    the old totals under the version of the change"""
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            auth_api_client.post(WORKDAY_URL, payload_workday)
+            # a concurrent calc reads the committed rows, still without the day
+            owner_id = WorkDay.objects.get().owner_id
+            stale = cache.get_or_calculate(
+                owner_id,
+                calc_payload["from_date"],
+                calc_payload["to_date"],
+                lambda: {"workdays": 0},
+            )
+            assert stale["workdays"] == 0
+
+    res = auth_api_client.post(CALCULATOR_URL, calc_payload)
+    assert res.data["workdays"] == 1
+
+
+def test_cache_timeout_setting(settings, shift):
+    """Test the results are cached with the configured timeout"""
+    settings.WORKTIME_CALC_CACHE_TIMEOUT = 0
+    day = date(2020, 1, 1)
+    calls = []
+
+    for _ in range(2):
+        cache.get_or_calculate(
+            shift.owner_id,
+            day,
+            day,
+            lambda: calls.append(1) or {},
+        )
+    assert len(calls) == 2
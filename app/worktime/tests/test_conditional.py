@@ -0,0 +1,121 @@
+from datetime import date
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from worktime import cache
+from worktime.models import WorkDay
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+SHIFT_URL = reverse("worktime:shift-list")
+CALCULATOR_URL = reverse("worktime:work_calc")
+
+
+@pytest.fixture
+def day(shift):
+    return WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2020, 10, 10),
+        day=1,
+    )
+
+
+@pytest.mark.parametrize("url", [WORKDAY_URL, SHIFT_URL])
+def test_same_etag_is_not_modified(auth_api_client, day, url):
+    """Test the list answers 304 without reading the rows"""
+    res = auth_api_client.get(url)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.has_header("Last-Modified")
+
+    with CaptureQueriesContext(connection) as context:
+        res = auth_api_client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not any("worktime_" in query["sql"] for query in context.captured_queries)
+
+
+def test_detail_not_modified_since(auth_api_client, day):
+    url = reverse("worktime:workday-detail", args=[day.id])
+    res = auth_api_client.get(url)
+
+    res = auth_api_client.get(url, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"])
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_change_in_the_same_second_is_modified(
+    auth_api_client,
+    day,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    """Test a change in the second of the Last-Modified isn't a 304"""
+    monkeypatch.setattr(cache.time, "time", lambda: 1000.2)
+    url = reverse("worktime:workday-detail", args=[day.id])
+    res = auth_api_client.get(url)
+    last_modified = res["Last-Modified"]
+
+    for _ in range(2):
+        monkeypatch.setattr(cache.time, "time", lambda: 1000.6)
+        day.comment = "changed"
+        with django_capture_on_commit_callbacks(execute=True):
+            day.save()
+
+        res = auth_api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert res.status_code == status.HTTP_200_OK
+        assert res["Last-Modified"] != last_modified
+        last_modified = res["Last-Modified"]
+
+
+def test_change_gives_new_etag(
+    auth_api_client,
+    day,
+    django_capture_on_commit_callbacks,
+):
+    """Test a change of the owner data changes the etag"""
+    res = auth_api_client.get(WORKDAY_URL)
+    etag = res["ETag"]
+
+    day.comment = "changed"
+    with django_capture_on_commit_callbacks(execute=True):
+        day.save()
+
+    res = auth_api_client.get(WORKDAY_URL, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == status.HTTP_200_OK
+    assert res["ETag"] != etag
+
+
+def test_calculator_get(auth_api_client, day):
+    """Test the calculator over get can be answered with 304"""
+    params = {"from_date": "2020-10-01", "to_date": "2020-10-31"}
+    res = auth_api_client.get(CALCULATOR_URL, params)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.data["weekend"] == 1
+
+    res = auth_api_client.get(CALCULATOR_URL, params, HTTP_IF_NONE_MATCH=res["ETag"])
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_etag_during_the_write_is_not_kept(
+    auth_api_client,
+    day,
+    django_capture_on_commit_callbacks,
+):
+    """Test a get between the change and its commit has the old etag,
+    so the client gets the new body once the change is committed"""
+    etag = auth_api_client.get(WORKDAY_URL)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            day.comment = "changed"
+            day.save()
+            during = auth_api_client.get(WORKDAY_URL)["ETag"]
+            assert during == etag
+
+    res = auth_api_client.get(WORKDAY_URL, HTTP_IF_NONE_MATCH=during)
+    assert res.status_code == status.HTTP_200_OK
+    assert res["ETag"] != during
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+from io import StringIO
+import pytest
+from django.core.management import call_command
+
+from worktime.models import Shift, WorkDay, WorkDayMonth
+from worktime.rollup import totals
+
+pytestmark = pytest.mark.django_db
+
+MINUTES = [(-40, -20), (-3, 0), (0, 14), (4, 15), (12, 47), (31, 95)]
+
+
+@pytest.fixture
+def days(shift, work_times):
+    for i, (before, after) in enumerate(MINUTES):
+        WorkDay.objects.create(
+            owner=shift.owner,
+            shift=shift,
+            date=date(2022, 6, 1) + timedelta(days=i),
+            day=0,
+            **work_times(shift, before, after),
+        )
+
+
+def month_totals(owner):
+    month = WorkDayMonth.objects.values().get(owner=owner)
+    return {key: month[key] for key in ["late_for_work", "overtime", "early_leave"]}
+
+
+def range_totals(owner):
+    data = WorkDay.objects.filter(owner=owner).totals()
+    return {key: data[key] for key in ["late_for_work", "overtime", "early_leave"]}
+
+
+def test_default_rules(shift, days):
+    """Test the default rules are the rules of the old calculator"""
+    expected = {"late_for_work": 47, "overtime": 157, "early_leave": -20}
+    assert range_totals(shift.owner) == expected
+    assert month_totals(shift.owner) == expected
+
+
+def test_shift_rules(shift, days):
+    """Test thresholds, rounding and cap of the shift"""
+    shift.late_threshold = 5
+    shift.early_leave_threshold = 30
+    shift.overtime_threshold = 30
+    shift.overtime_cap = 60
+    shift.rounding = 5
+    shift.save()
+
+    expected = {"late_for_work": 40, "overtime": 105, "early_leave": 0}
+    assert range_totals(shift.owner) == expected
+    assert month_totals(shift.owner) == expected
+
+
+def test_rules_change_rebuilds_months_once(shift, days, django_assert_num_queries):
+    """Test saving a shift without changes leaves the rollups"""
+    shift = Shift.objects.get(pk=shift.pk)
+    with django_assert_num_queries(1):
+        shift.save()
+
+
+def test_calculator_uses_the_rules(shift, days):
+    """Test the calculator totals follow the rules"""
+    shift.overtime_cap = 20
+    shift.save()
+    data = totals(shift.owner, date(2022, 6, 1), date(2022, 6, 30))
+    assert data["overtime"] == 15 + 20 + 20
+
+
+def test_benchmark_command(shift, days):
+    """Test the benchmark compares both calculators"""
+    out = StringIO()
+    call_command("benchmark_calculator", "--repeat", "1", stdout=out)
+    output = out.getvalue()
+    assert "6 work days" in output
+    assert "per row:" in output
+    assert "engine:" in output
+    assert "the results are the same" in output
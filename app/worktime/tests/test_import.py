@@ -0,0 +1,185 @@
+from datetime import date, datetime, time
+from io import StringIO
+import csv
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from openpyxl import Workbook
+
+from worktime import importer
+from worktime.cache import get_version
+from worktime.importer import IMPORT_COLUMNS
+from worktime.models import ImportJob, WorkDay, WorkDayMonth
+from worktime.tasks import import_workdays
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def rows(shift):
+    """Ten days of march, the last two rows have errors"""
+    email = shift.owner.email
+    rows = [
+        [email, f"2022-03-{i + 1:02}", 0, "08:05", "16:30", shift.id, ""]
+        for i in range(8)
+    ]
+    rows.append([email, "2022-03-01", 0, "08:00", "16:30", shift.id, ""])
+    rows.append(["nobody@example.com", "2022-03-10", 1, "", "", shift.id, ""])
+    return rows
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(IMPORT_COLUMNS)
+        writer.writerows(rows)
+    return str(path)
+
+
+def upload_csv(path, rows):
+    with open(write_csv(path, rows), "rb") as file:
+        return SimpleUploadedFile("march.csv", file.read())
+
+
+@patch("worktime.importer.IMPORT_BATCH_SIZE", 3)
+def test_import_csv_command(media, shift, rows):
+    """Test the command imports the valid rows in batches"""
+    out = StringIO()
+    path = write_csv(media / "march.csv", rows)
+    with patch(
+        "worktime.importer.import_batch",
+        wraps=importer.import_batch,
+    ) as patched_batch:
+        call_command("import_workdays", path, "--now", stdout=out)
+
+    assert patched_batch.call_count == 4
+    assert "10 rows, 8 imported, 2 failed" in out.getvalue()
+    assert WorkDay.objects.filter(owner=shift.owner).count() == 8
+    assert set(WorkDay.objects.values_list("before_work", flat=True)) == {5}
+    assert WorkDayMonth.objects.get(owner=shift.owner).late_for_work == 40
+
+    job = ImportJob.objects.get()
+    assert job.status == ImportJob.Status.DONE
+    errors = list(csv.DictReader(job.errors_file.open("r")))
+    assert [row["email"] for row in errors] == [
+        shift.owner.email,
+        "nobody@example.com",
+    ]
+
+
+def test_import_xlsx_command(media, shift):
+    """Test the xlsx cells are read with their types"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(IMPORT_COLUMNS)
+    sheet.append(
+        [
+            shift.owner.email,
+            datetime(2022, 3, 1),
+            0,
+            time(8, 10),
+            time(16, 30),
+            str(shift.id),
+            "xlsx",
+        ]
+    )
+    workbook.save(media / "march.xlsx")
+
+    path = str(media / "march.xlsx")
+    call_command("import_workdays", path, "--now", stdout=StringIO())
+    day = WorkDay.objects.get(owner=shift.owner)
+    assert day.date == date(2022, 3, 1)
+    assert day.before_work == 10
+
+
+@patch("worktime.management.commands.import_workdays.import_workdays.delay")
+def test_import_command_starts_task(patched_delay, media, shift, rows):
+    """Test the command starts the import in the workers"""
+    path = write_csv(media / "march.csv", rows)
+    call_command("import_workdays", path, stdout=StringIO())
+    patched_delay.assert_called_once_with(str(ImportJob.objects.get().pk))
+
+
+def test_import_task(media, shift, rows):
+    """Test the task imports the file of the job"""
+    job = ImportJob.objects.create(file=upload_csv(media / "march.csv", rows))
+    import_workdays(str(job.pk))
+    job.refresh_from_db()
+    assert (job.processed, job.imported, job.failed) == (10, 8, 2)
+
+
+def test_import_task_with_invalid_date(media, shift, rows):
+    """Test a row with an invalid date fails alone, not the job"""
+    rows.insert(4, [shift.owner.email, "04/01/2021", 1, "", "", shift.id, ""])
+    rows.insert(5, [shift.owner.email, "", 1, "", "", shift.id, ""])
+    job = ImportJob.objects.create(file=upload_csv(media / "march.csv", rows))
+    import_workdays(str(job.pk))
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.DONE
+    assert (job.processed, job.imported, job.failed) == (12, 8, 4)
+    with job.errors_file.open("r") as file:
+        dates = [row["date"] for row in csv.DictReader(file)]
+    assert "04/01/2021" in dates
+
+
+@patch("worktime.importer.IMPORT_BATCH_SIZE", 3)
+def test_import_task_failure_keeps_the_bumps(
+    media,
+    shift,
+    rows,
+    django_capture_on_commit_callbacks,
+):
+    """Test the owners of the committed batches are bumped on a failure"""
+    job = ImportJob.objects.create(file=upload_csv(media / "march.csv", rows))
+    version = get_version(shift.owner_id)
+    import_batch = importer.import_batch
+    batches = []
+
+    def fail_third(batch):
+        batches.append(batch)
+        if len(batches) == 3:
+            raise IntegrityError("duplicate key value")
+        return import_batch(batch)
+
+    with patch("worktime.importer.import_batch", side_effect=fail_third):
+        with pytest.raises(IntegrityError):
+            with django_capture_on_commit_callbacks(execute=True):
+                import_workdays(str(job.pk))
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILED
+    assert get_version(shift.owner_id) > version
+
+
+@patch("worktime.admin.import_workdays.delay")
+def test_admin_upload(
+    patched_delay,
+    client,
+    media,
+    shift,
+    rows,
+    django_capture_on_commit_callbacks,
+):
+    """Test the admin upload starts the import"""
+    admin = get_user_model().objects.create_superuser("xaos@xaos.com", "passWord")
+    client.force_login(admin)
+    upload = upload_csv(media / "march.csv", rows)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        res = client.post(reverse("admin:worktime_importjob_add"), {"file": upload})
+
+    assert res.status_code == 302
+    job = ImportJob.objects.get()
+    assert job.owner == admin
+    patched_delay.assert_called_once_with(str(job.pk))
@@ -163,3 +163,57 @@ def test_create_work_day_without_owner_should_fail(create_user, def_user):
     with pytest.raises(IntegrityError) as error:
         work_day = WorkDay.objects.create(**payload)
     assert "null value in column" in str(error.value)
+
+
+# -------------------- Test derived minutes --------------------
+
+
+def test_work_day_minutes_from_db(create_user, def_user):
+    """Test the db computes the minutes of a normal day on insert"""
+    user = create_user(**def_user)
+    shift = Shift.objects.create(start_of_shift=start, end_of_shift=end, owner=user)
+    work_day = WorkDay.objects.create(
+        start_of_work=start_day,
+        end_of_work=end_day,
+        owner=user,
+        shift=shift,
+        date=date(2021, 11, 10),
+    )
+    assert (work_day.before_work, work_day.after_work) == (-35, 1)
+
+
+def test_work_day_minutes_on_update(create_user, def_user):
+    """Test the minutes follow the times on update"""
+    user = create_user(**def_user)
+    shift = Shift.objects.create(start_of_shift=start, end_of_shift=end, owner=user)
+    work_day = WorkDay.objects.create(
+        start_of_work=start_day,
+        end_of_work=end_day,
+        owner=user,
+        shift=shift,
+        date=date(2021, 11, 10),
+    )
+    work_day.start_of_work = time(9, 0)
+    work_day.save()
+    assert work_day.before_work == 30
+
+    work_day.day = 2
+    work_day.save()
+    assert (work_day.before_work, work_day.after_work) == (None, None)
+
+
+def test_work_day_minutes_bulk_create(create_user, def_user):
+    """Test bulk inserts get the minutes from the db"""
+    user = create_user(**def_user)
+    shift = Shift.objects.create(start_of_shift=start, end_of_shift=end, owner=user)
+    days = WorkDay.objects.bulk_create(
+        WorkDay(
+            start_of_work=time(8, 30 + i),
+            end_of_work=end_day,
+            owner=user,
+            shift=shift,
+            date=date(2021, 11, 10 + i),
+        )
+        for i in range(3)
+    )
+    assert [day.before_work for day in days] == [0, 1, 2]
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.models import Shift, WorkDay
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+SHIFT_URL = reverse("worktime:shift-list")
+
+
+@pytest.fixture
+def days(shift):
+    start = date(2020, 1, 1)
+    return WorkDay.objects.bulk_create(
+        WorkDay(owner=shift.owner, shift=shift, date=start + timedelta(days=i), day=2)
+        for i in range(7)
+    )
+
+
+def walk(client, url):
+    """Follow the next links and return the pages"""
+    pages = []
+    while url:
+        res = client.get(url)
+        assert res.status_code == status.HTTP_200_OK
+        pages.append(res.data["results"])
+        url = res.data["next"]
+    return pages
+
+
+def test_workday_pages_follow_the_dates(auth_api_client, days):
+    """Test the pages cover every day once, in date order"""
+    pages = walk(auth_api_client, f"{WORKDAY_URL}?page_size=3")
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    dates = [row["date"] for page in pages for row in page]
+    assert dates == [str(day.date) for day in days]
+
+
+def test_workday_page_has_no_offset_and_no_count(auth_api_client, days):
+    """Test the next page is a keyset read without OFFSET or COUNT"""
+    res = auth_api_client.get(f"{WORKDAY_URL}?page_size=3")
+
+    with CaptureQueriesContext(connection) as context:
+        auth_api_client.get(res.data["next"])
+
+    for query in context.captured_queries:
+        sql = query["sql"]
+        assert "OFFSET" not in sql
+        assert "COUNT(" not in sql
+    assert any('"date" > ' in query["sql"] for query in context.captured_queries)
+
+
+def test_shift_pages_follow_the_creation(auth_api_client, shift):
+    """Test the shifts are paged by the time they were created"""
+    shifts = [
+        Shift.objects.create(
+            start_of_shift="08:00",
+            end_of_shift="16:00",
+            owner=shift.owner,
+        )
+        for _ in range(4)
+    ]
+    shifts.insert(0, shift)
+    pages = walk(auth_api_client, f"{SHIFT_URL}?page_size=2")
+
+    ids = [row["id"] for page in pages for row in page]
+    assert ids == [str(shift.id) for shift in shifts]
@@ -0,0 +1,90 @@
+"""The plans of the worktime queries on a seeded db,
+the queries of one owner and a range must use the indexes"""
+from datetime import date, timedelta
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from worktime.models import WorkDay
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+CALCULATOR_URL = reverse("worktime:work_calc")
+EXPORT_URL = reverse("worktime:workday-export")
+
+
+@pytest.fixture
+def seeded(auth_api_client, shift):
+    """Two years of days for the user and 9 more owners"""
+    owners = [shift.owner] + [
+        get_user_model().objects.create(email=f"owner{i}@example.com")
+        for i in range(9)
+    ]
+    start = date(2019, 1, 1)
+    WorkDay.objects.bulk_create(
+        WorkDay(owner=owner, shift=shift, date=start + timedelta(days=i), day=i % 3)
+        for owner in owners
+        for i in range(730)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE worktime_workday")
+
+    return auth_api_client
+
+
+def plan_of(context) -> str:
+    """The plan of the query of the work days of the request"""
+    sql = next(
+        query["sql"]
+        for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "worktime_workday"' in query["sql"]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}")
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def assert_index_scan(plan, index=None):
+    assert "Seq Scan on worktime_workday" not in plan, plan
+    assert "Index" in plan, plan
+    if index is not None:
+        assert index in plan, plan
+
+
+def test_list_plan(seeded):
+    with CaptureQueriesContext(connection) as context:
+        seeded.get(WORKDAY_URL, {"from": "2020-03-01", "to": "2020-03-31"})
+
+    assert_index_scan(plan_of(context))
+
+
+def test_calc_plan(seeded):
+    """Test the totals are read from the covering index"""
+    with CaptureQueriesContext(connection) as context:
+        seeded.post(
+            CALCULATOR_URL,
+            {"from_date": "2020-03-05", "to_date": "2020-03-25"},
+        )
+
+    assert_index_scan(plan_of(context), "worktime_workday_totals_idx")
+
+
+def test_export_plan(seeded):
+    with CaptureQueriesContext(connection) as context:
+        response = seeded.get(
+            EXPORT_URL,
+            {"from": "2020-03-01", "to": "2020-03-31", "format": "csv"},
+        )
+        b"".join(response.streaming_content)
+
+    assert_index_scan(plan_of(context))
+
+
+def test_recompute_plan(seeded, shift):
+    """Test the normal days of a shift come from the partial index"""
+    plan = WorkDay.objects.filter(shift=shift, day=0).only("pk").explain()
+    assert_index_scan(plan, "worktime_workday_normal_idx")
@@ -0,0 +1,127 @@
+from datetime import date, time, timedelta
+from io import StringIO
+import pytest
+from unittest.mock import patch
+from django.core.cache import caches
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from worktime.cache import get_version
+from worktime.models import Shift, WorkDay
+from worktime.rollup import totals
+from worktime.tasks import recompute_shift_minutes_task
+
+pytestmark = pytest.mark.django_db
+
+WORKDAY_URL = reverse("worktime:workday-list")
+
+
+def shift_url_details(id):
+    return reverse("worktime:shift-detail", args=[id])
+
+
+@pytest.fixture
+def days(auth_api_client, shift):
+    """Three normal days of the 8:00-16:30 shift and one weekend"""
+    times = [
+        (time(8, 0), time(16, 30)),
+        (time(8, 10), time(17, 0)),
+        (time(7, 50), time(16, 0)),
+    ]
+    for i, (start, end) in enumerate(times):
+        res = auth_api_client.post(
+            WORKDAY_URL,
+            {
+                "day": 0,
+                "start_of_work": start,
+                "end_of_work": end,
+                "date": date(2022, 4, 4) + timedelta(days=i),
+                "shift": shift.id,
+            },
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+
+    WorkDay.objects.create(owner=shift.owner, shift=shift, date=date(2022, 4, 9), day=1)
+
+
+def minutes(shift):
+    return list(
+        WorkDay.objects.filter(shift=shift, day=0).values_list(
+            "before_work", "after_work"
+        )
+    )
+
+
+def test_shift_update_recomputes_minutes(auth_api_client, shift, days):
+    """Test correcting the shift times updates the days and the totals"""
+    assert minutes(shift) == [(0, 0), (10, 30), (-10, -30)]
+
+    res = auth_api_client.patch(
+        shift_url_details(shift.id),
+        {"start_of_shift": time(8, 30), "end_of_shift": time(16, 0)},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert minutes(shift) == [(-30, 30), (-20, 60), (-40, 0)]
+
+    data = totals(shift.owner, date(2022, 4, 1), date(2022, 4, 30))
+    assert data["late_for_work"] == 0
+    assert data["overtime"] == 90
+    assert data["weekend"] == 1
+
+
+def test_large_shift_is_recomputed_in_celery(
+    auth_api_client,
+    shift,
+    days,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    """Test shifts with many days are recomputed from the workers"""
+    settings.WORKTIME_RECOMPUTE_ASYNC_ROWS = 2
+    with patch("worktime.signals.recompute_shift_minutes_task.delay") as patched:
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_api_client.patch(
+                shift_url_details(shift.id), {"start_of_shift": time(8, 30)}
+            )
+
+    patched.assert_called_once_with(str(shift.id))
+    assert minutes(shift) == [(0, 0), (10, 30), (-10, -30)]
+
+
+def test_celery_recompute_bumps_the_shared_cache(
+    shift,
+    days,
+    settings,
+    tmp_path,
+    django_capture_on_commit_callbacks,
+):
+    """Test the version bump of the worker is seen from another process"""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    version = get_version(shift.owner_id)
+    Shift.objects.filter(pk=shift.pk).update(start_of_shift=time(8, 10))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recompute_shift_minutes_task(str(shift.id))
+
+    # a new connection of the same cache, like the one of the app
+    app_cache = caches.create_connection("default")
+    assert app_cache.get(f"worktime:version:{shift.owner_id}") > version
+
+
+def test_recompute_command(shift, days):
+    """Test the command recomputes the days and reports the rows"""
+    # an update without the signals leaves the minutes stale
+    Shift.objects.filter(pk=shift.pk).update(start_of_shift=time(8, 10))
+    assert minutes(shift) == [(0, 0), (10, 30), (-10, -30)]
+
+    out = StringIO()
+    call_command("recompute_workday_minutes", stdout=out)
+
+    assert "3 rows touched in" in out.getvalue()
+    assert minutes(shift) == [(-10, 0), (0, 30), (-20, -30)]
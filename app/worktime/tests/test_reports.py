@@ -0,0 +1,117 @@
+from datetime import date, time
+import csv
+import io
+import pytest
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework import status
+
+from hms.celery import app
+from worktime.models import ReportJob, Shift, WorkDay
+from worktime.tasks import start_report
+
+pytestmark = pytest.mark.django_db
+
+REPORT_URL = reverse("worktime:reportjob-list")
+
+
+def report_url(id, action="detail"):
+    return reverse(f"worktime:reportjob-{action}", args=[id])
+
+
+@pytest.fixture
+def eager_celery(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    app.conf.task_always_eager = True
+    yield
+    app.conf.task_always_eager = False
+
+
+@pytest.fixture
+def staff(create_user, work_times):
+    for i in range(5):
+        user = create_user(email=f"user{i}@example.com")
+        shift = Shift.objects.create(
+            start_of_shift=time(8, 0),
+            end_of_shift=time(16, 0),
+            owner=user,
+        )
+        WorkDay.objects.create(
+            owner=user,
+            shift=shift,
+            date=date(2022, 3, 1),
+            day=0,
+            **work_times(shift, i, 0),
+        )
+
+
+def test_report_not_admin_should_fail(auth_api_client):
+    """Test simple users can't submit reports"""
+    res = auth_api_client.post(REPORT_URL, {})
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@patch("worktime.views.start_report.delay")
+def test_submit_report_returns_job(
+    patched_delay,
+    admin_api_client,
+    django_capture_on_commit_callbacks,
+):
+    """Test submit returns the job and starts the task after commit"""
+    payload = {"from_date": date(2022, 1, 1), "to_date": date(2022, 12, 31)}
+    with django_capture_on_commit_callbacks(execute=True):
+        res = admin_api_client.post(REPORT_URL, payload)
+
+    assert res.status_code == status.HTTP_202_ACCEPTED
+    assert res.data["status"] == ReportJob.Status.PENDING
+    patched_delay.assert_called_once_with(res.data["id"])
+
+
+def test_download_not_ready_should_fail(admin_api_client):
+    """Test download a pending report"""
+    payload = {"from_date": date(2022, 1, 1), "to_date": date(2022, 12, 31)}
+    with patch("worktime.views.start_report.delay"):
+        res = admin_api_client.post(REPORT_URL, payload)
+
+    res = admin_api_client.get(report_url(res.data["id"], "download"))
+    assert res.status_code == status.HTTP_409_CONFLICT
+
+
+@patch("worktime.tasks.REPORT_CHUNK_SIZE", 2)
+def test_report_runs_in_chunks(admin_api_client, staff, eager_celery):
+    """Test the report is split in chunks and the file is written"""
+    payload = {"from_date": date(2022, 1, 1), "to_date": date(2022, 12, 31)}
+    with patch("worktime.views.start_report.delay"):
+        res = admin_api_client.post(REPORT_URL, payload)
+
+    with patch(
+        "worktime.tasks.report_chunk.run",
+        wraps=start_report.app.tasks["worktime.tasks.report_chunk"].run,
+    ) as patched_chunk:
+        start_report(res.data["id"])
+    assert patched_chunk.call_count == 3
+
+    res = admin_api_client.get(report_url(res.data["id"]))
+    assert res.data["status"] == ReportJob.Status.DONE
+
+    res = admin_api_client.get(report_url(res.data["id"], "download"))
+    assert res.status_code == status.HTTP_200_OK
+    content = b"".join(res.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert len(rows) == 5
+    assert sorted(int(row["late_for_work"]) for row in rows) == [0, 1, 2, 3, 4]
+
+
+def test_report_without_days(create_user, eager_celery):
+    """Test a report of a range without days is empty"""
+    job = ReportJob.objects.create(
+        owner=create_user(),
+        from_date=date(2022, 1, 1),
+        to_date=date(2022, 1, 31),
+    )
+    start_report(str(job.pk))
+    job.refresh_from_db()
+    assert job.status == ReportJob.Status.DONE
+    assert job.file.read().decode().splitlines() == [
+        ",".join(["user", "email"] + list(WorkDay.objects.totals_expressions()))
+    ]
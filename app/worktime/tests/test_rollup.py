@@ -0,0 +1,184 @@
+import threading
+from datetime import date, time, timedelta
+from time import sleep
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from worktime.models import Shift, WorkDay, WorkDayMonth
+from worktime.rollup import next_month, rebuild_months, totals
+
+pytestmark = pytest.mark.django_db
+
+CALCULATOR_URL = reverse("worktime:work_calc")
+
+
+def create_days(shift, start, days):
+    """Create one work day per day, alternate late, overtime and weekend"""
+    for i in range(days):
+        day = start + timedelta(days=i)
+        if i % 7 in (5, 6):
+            WorkDay.objects.create(owner=shift.owner, shift=shift, date=day, day=1)
+            continue
+
+        WorkDay.objects.create(
+            owner=shift.owner,
+            shift=shift,
+            date=day,
+            day=0,
+            start_of_work=time(8, i % 3),
+            end_of_work=time(16, 20 + (i % 4) * 10),
+        )
+
+
+def test_create_work_day_updates_month(shift):
+    """Test creating a work day adds to its month rollup"""
+    WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2021, 3, 10),
+        day=0,
+        start_of_work=time(8, 5),
+        end_of_work=time(16, 50),
+    )
+    month = WorkDayMonth.objects.get(owner=shift.owner)
+    assert month.month == date(2021, 3, 1)
+    assert month.late_for_work == 5
+    assert month.overtime == 20
+    assert month.workdays == 1
+
+
+def test_delete_work_day_updates_month(shift):
+    """Test deleting a work day subtracts from its month rollup"""
+    day = WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2021, 3, 10),
+        day=0,
+        end_of_work=time(16, 20),
+    )
+    day.delete()
+    month = WorkDayMonth.objects.get(owner=shift.owner)
+    assert month.early_leave == 0
+    assert month.workdays == 0
+
+
+def test_update_work_day_moves_delta(shift):
+    """Test changing a work day applies only the delta"""
+    WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2021, 3, 10),
+        day=0,
+        start_of_work=time(8, 5),
+    )
+    day = WorkDay.objects.get(owner=shift.owner)
+    day.day = 3
+    day.date = date(2021, 4, 2)
+    day.save()
+
+    march, april = WorkDayMonth.objects.filter(owner=shift.owner)
+    assert (march.workdays, march.late_for_work) == (0, 0)
+    assert (april.sick_leaves, april.workdays) == (1, 0)
+
+
+def test_totals_match_plain_aggregate(shift):
+    """Test the rollup totals are the same with the days scan"""
+    create_days(shift, date(2021, 1, 1), 400)
+
+    for start, end in [
+        (date(2021, 1, 1), date(2021, 12, 31)),
+        (date(2021, 1, 15), date(2021, 11, 3)),
+        (date(2021, 2, 3), date(2021, 2, 20)),
+        (date(2021, 5, 1), date(2022, 1, 20)),
+    ]:
+        days = WorkDay.objects.filter(
+            owner=shift.owner, date__gte=start, date__lte=end
+        ).totals()
+        assert totals(shift.owner, start, end) == days
+
+
+def test_calculator_year_range_scans_months(
+    shift,
+    auth_api_client,
+    django_assert_num_queries,
+):
+    """Test a year range uses the rollups and the edges in two queries"""
+    create_days(shift, date(2021, 1, 1), 365)
+    payload = {"from_date": date(2021, 1, 10), "to_date": date(2021, 12, 31)}
+
+    with django_assert_num_queries(2):
+        res = auth_api_client.post(CALCULATOR_URL, payload)
+    assert res.data["workdays"] + res.data["weekend"] == 356
+
+
+def test_rebuild_command(shift):
+    """Test the command rebuilds the rollups from the days"""
+    create_days(shift, date(2021, 1, 1), 60)
+    expected = list(WorkDayMonth.objects.values())
+    WorkDayMonth.objects.update(workdays=0)
+
+    call_command("rebuild_worktime_rollups")
+    rebuilt = list(WorkDayMonth.objects.values())
+    for row in expected + rebuilt:
+        row.pop("id")
+    assert rebuilt == expected
+
+
+def test_shift_delete_updates_months_once(shift):
+    """Test deleting a shift subtracts its days once per month"""
+    other = Shift.objects.create(
+        owner=shift.owner, start_of_shift=time(6), end_of_shift=time(14)
+    )
+    create_days(shift, date(2021, 1, 1), 50)
+    create_days(other, date(2021, 2, 20), 20)
+
+    with CaptureQueriesContext(connection) as queries:
+        shift.delete()
+
+    sqls = [query["sql"] for query in queries.captured_queries]
+    assert sum(sql.startswith('UPDATE "worktime_workdaymonth"') for sql in sqls) == 2
+    assert not any(sql.startswith('SELECT "worktime_shift"') for sql in sqls)
+    for month in WorkDayMonth.objects.all():
+        days = WorkDay.objects.filter(
+            owner=shift.owner, date__gte=month.month, date__lt=next_month(month.month)
+        ).totals()
+        assert {key: getattr(month, key) for key in days} == days
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_rebuilds_of_one_month(shift):
+    """Test two writers of the same month both end in the rollup"""
+    committed = threading.Event()
+    errors = []
+
+    def write(day, wait=None):
+        try:
+            with transaction.atomic():
+                WorkDay.objects.bulk_create(
+                    [WorkDay(owner=shift.owner, shift=shift, date=day, day=1)]
+                )
+                rebuild_months(WorkDay.objects.filter(date=day))
+                if wait is not None:
+                    wait.wait(5)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    first = threading.Thread(target=write, args=(date(2022, 6, 1), committed))
+    second = threading.Thread(target=write, args=(date(2022, 6, 2),))
+    first.start()
+    sleep(0.2)
+    second.start()
+    # the second writer waits for the month row of the first one
+    sleep(0.5)
+    committed.set()
+    first.join()
+    second.join()
+
+    assert errors == []
+    month = WorkDayMonth.objects.get(owner=shift.owner, month=date(2022, 6, 1))
+    assert month.weekend == 2
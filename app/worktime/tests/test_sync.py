@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from worktime.models import Tombstone, WorkDay
+from worktime.tasks import purge_tombstones
+
+pytestmark = pytest.mark.django_db
+
+SYNC_URL = reverse("worktime:sync")
+
+
+@pytest.fixture
+def day(shift):
+    return WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2020, 10, 10),
+        day=1,
+    )
+
+
+@pytest.fixture
+def no_overlap(settings):
+    settings.WORKTIME_SYNC_OVERLAP = 0
+
+
+def test_full_sync(auth_api_client, day):
+    """Test without a cursor everything of the owner is given"""
+    res = auth_api_client.get(SYNC_URL)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [row["id"] for row in res.data["workdays"]] == [str(day.id)]
+    assert [row["id"] for row in res.data["shifts"]] == [str(day.shift_id)]
+    assert res.data["deleted"] == []
+    assert res.data["cursor"]
+
+
+def test_delta_sync(auth_api_client, day, shift, no_overlap):
+    """Test only the changes after the cursor are given"""
+    cursor = auth_api_client.get(SYNC_URL).data["cursor"]
+
+    changed = WorkDay.objects.create(
+        owner=shift.owner,
+        shift=shift,
+        date=date(2020, 10, 11),
+        day=1,
+    )
+    res = auth_api_client.get(SYNC_URL, {"since": cursor})
+
+    assert [row["id"] for row in res.data["workdays"]] == [str(changed.id)]
+    assert res.data["shifts"] == []
+
+    day_id = str(day.id)
+    day.delete()
+    res = auth_api_client.get(SYNC_URL, {"since": res.data["cursor"]})
+    assert res.data["workdays"] == []
+    assert res.data["deleted"] == [
+        {
+            "type": "workday",
+            "id": day_id,
+            "deleted_at": res.data["deleted"][0]["deleted_at"],
+        }
+    ]
+
+
+def test_partial_update_is_synced(auth_api_client, day, no_overlap):
+    cursor = auth_api_client.get(SYNC_URL).data["cursor"]
+    url = reverse("worktime:workday-detail", args=[day.id])
+    auth_api_client.patch(url, {"comment": "changed"})
+
+    res = auth_api_client.get(SYNC_URL, {"since": cursor})
+    assert [row["comment"] for row in res.data["workdays"]] == ["changed"]
+
+
+def test_shift_delete_gives_the_days(auth_api_client, day):
+    day.shift.delete()
+
+    kinds = sorted(Tombstone.objects.values_list("kind", flat=True))
+    assert kinds == ["shift", "workday"]
+
+
+def test_shift_delete_keeps_the_days_in_one_insert(day):
+    for offset in range(1, 10):
+        WorkDay.objects.create(
+            owner_id=day.owner_id,
+            shift=day.shift,
+            date=day.date + timedelta(days=offset),
+            day=1,
+        )
+
+    with CaptureQueriesContext(connection) as queries:
+        day.shift.delete()
+
+    inserts = [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith('INSERT INTO "worktime_tombstone"')
+    ]
+    assert len(inserts) == 1
+    assert Tombstone.objects.filter(kind="workday").count() == 10
+
+
+def test_owner_delete_keeps_no_tombstones(day):
+    get_user_model().objects.filter(pk=day.owner_id).delete()
+    assert not Tombstone.objects.exists()
+
+
+def test_old_cursor_should_fail(auth_api_client, settings):
+    since = timezone.now() - timedelta(
+        days=settings.WORKTIME_TOMBSTONE_RETENTION_DAYS + 1
+    )
+    res = auth_api_client.get(SYNC_URL, {"since": since.isoformat()})
+    assert res.status_code == status.HTTP_410_GONE
+
+
+def test_purge_tombstones(day, settings):
+    day.delete()
+    Tombstone.objects.update(
+        deleted_at=timezone.now()
+        - timedelta(days=settings.WORKTIME_TOMBSTONE_RETENTION_DAYS + 1)
+    )
+
+    assert purge_tombstones() == {"deleted": 1}
+    assert not Tombstone.objects.exists()
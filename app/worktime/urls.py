@@ -8,8 +8,12 @@ app_name = "worktime"
 router = DefaultRouter()
 router.register("shift", views.ShiftViewAPI)
 router.register("workday", views.WorkDayViewAPI)
+router.register("report", views.ReportJobViewAPI)
 
 urlpatterns = [
     path("", include(router.urls), name="shift"),
     path("workCalc/", views.WorkDayCalculate.as_view(), name="work_calc"),
+    path("teamCalc/", views.TeamCalculate.as_view(), name="team_calc"),
+    path("series/", views.WorkDaySeries.as_view(), name="series"),
+    path("sync/", views.SyncView.as_view(), name="sync"),
 ]
@@ -1,18 +1,71 @@
 """Views for the worktime"""
 
 
-from rest_framework import mixins, generics, viewsets, views
+import csv
+import json
+from datetime import timedelta
+from functools import cached_property
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Trunc
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import mixins, generics, serializers, status, viewsets, views
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from core.authentication import CachedJWTAuthentication
+from core.perm_class import UserPermissions
 from worktime.serializers import (
+    ReportJobSerializer,
+    SeriesSerializer,
     ShiftSerializer,
+    SyncSerializer,
+    TeamCalculatorSerializer,
+    TombstoneSerializer,
     WorkCaclulatorSerializer,
     WorkDayDetailsSerializer,
+    WorkDayExportSerializer,
+    WorkDayListSerializer,
     WorkDaySerializer,
+    WorkDayUpsertSerializer,
+)
+from worktime.models import ReportJob, Shift, Tombstone, WorkDay
+from worktime.pagination import ShiftPagination, WorkDayPagination
+from worktime.renderers import CSVRenderer, NDJSONRenderer
+from worktime.tasks import start_report
+from worktime import cache, rollup
+
+
+class Echo:
+    """Pseudo buffer, the csv writer returns the line to be streamed"""
+
+    def write(self, value):
+        return value
+
+
+def owner_etag(request, *args, **kwargs) -> str:
+    # the version changes with every change of the days and the shifts
+    owner_id = request.user.pk
+    return f"{owner_id}-{cache.get_version(owner_id)}"
+
+
+def owner_last_modified(request, *args, **kwargs):
+    return cache.changed_at(request.user.pk)
+
+
+# answer with 304 before the query when the data of the owner is the same
+owner_condition = condition(
+    etag_func=owner_etag,
+    last_modified_func=owner_last_modified,
 )
-from worktime.models import Shift, WorkDay
 
 
 class BaseViewAPI(
@@ -22,21 +75,73 @@ class BaseViewAPI(
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return self.queryset.filter(owner=self.request.user)
 
 
-class ShiftViewAPI(BaseViewAPI):
+@method_decorator(owner_condition, name="list")
+@method_decorator(owner_condition, name="retrieve")
+class ShiftViewAPI(mixins.UpdateModelMixin, BaseViewAPI):
     serializer_class = ShiftSerializer
     queryset = Shift.objects.all()
+    pagination_class = ShiftPagination
 
 
-class WorkDayViewAPI(BaseViewAPI):
+@method_decorator(owner_condition, name="list")
+@method_decorator(owner_condition, name="retrieve")
+class WorkDayViewAPI(mixins.UpdateModelMixin, BaseViewAPI):
     serializer_class = WorkDayDetailsSerializer
     queryset = WorkDay.objects.all()
+    pagination_class = WorkDayPagination
+    export_chunk_size = 2000
+    export_fields = [
+        "owner__email",
+        "date",
+        "day",
+        "start_of_work",
+        "end_of_work",
+        "before_work",
+        "after_work",
+        "shift_id",
+        "comment",
+        "id",
+    ]
+
+    bulk_max_items = 366
+
+    @cached_property
+    def list_params(self) -> dict:
+        params = WorkDayListSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    def get_queryset(self):
+        query = super().get_queryset()
+        if self.action != "list":
+            return query
+
+        data = self.list_params
+        if "from" in data:
+            query = query.filter(date__gte=data["from"])
+        if "to" in data:
+            query = query.filter(date__lte=data["to"])
+        if "day" in data:
+            query = query.filter(day=data["day"])
+        if data.get("fields"):
+            # the pagination reads the date and the id of the last day
+            query = query.only("date", "id", *data["fields"])
+
+        return query
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "list":
+            context["fields"] = self.list_params.get("fields")
+
+        return context
 
     def get_serializer(self, *args, **kwargs):
         if self.action == "list":
@@ -44,20 +149,174 @@ class WorkDayViewAPI(BaseViewAPI):
 
         return super().get_serializer(*args, **kwargs)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        serializer_class=WorkDaySerializer,
+    )
+    def bulk(self, request):
+        """Create many days, the days with errors are returned
+        with their index and the rest are created"""
+        items = request.data
+        if not isinstance(items, list) or not 0 < len(items) <= self.bulk_max_items:
+            return Response(
+                data=f"Give a list of 1 to {self.bulk_max_items} days",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = request.user
+        context = self.get_serializer_context()
+        context["existing_dates"] = set(
+            WorkDay.objects.filter(
+                owner=user,
+                date__in=self.parse_dates(items),
+            ).values_list("date", flat=True)
+        )
+
+        days, errors = [], []
+        for index, item in enumerate(items):
+            serializer = WorkDaySerializer(data=item, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+
+            days.append(WorkDay(**serializer.validated_data, owner=user))
+            # the same date twice in the list is an error too
+            context["existing_dates"].add(serializer.validated_data["date"])
+
+        if days:
+            try:
+                with transaction.atomic():
+                    WorkDay.objects.bulk_create(days)
+                    rollup.rebuild_months(
+                        WorkDay.objects.filter(
+                            owner=user,
+                            date__in=[day.date for day in days],
+                        )
+                    )
+            except IntegrityError:
+                return Response(
+                    data="Some dates were created meanwhile, please try again",
+                    status=status.HTTP_409_CONFLICT,
+                )
+            cache.bump_version_on_commit(user.pk)
+
+        return Response(
+            data={
+                "created": WorkDaySerializer(days, many=True).data,
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if days else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(
+        detail=False,
+        methods=["put"],
+        url_path=r"by-date/(?P<date>[0-9]{4}-[0-9]{2}-[0-9]{2})",
+        url_name="by-date",
+        serializer_class=WorkDayUpsertSerializer,
+    )
+    def by_date(self, request, date):
+        """Create the day of the date or replace it if it exists"""
+        try:
+            date = serializers.DateField().to_internal_value(date)
+        except serializers.ValidationError as error:
+            return Response(data=error.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        context = self.get_serializer_context()
+        context["date"] = date
+        serializer = WorkDayUpsertSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            day = serializer.save()
+            rollup.rebuild_months(WorkDay.objects.filter(pk=day.pk))
+        cache.bump_version_on_commit(request.user.pk)
+
+        return Response(data=WorkDayDetailsSerializer(day).data)
+
+    @staticmethod
+    def parse_dates(items) -> list:
+        """The valid dates of the items, the rest fail in the serializer"""
+        field = serializers.DateField()
+        dates = []
+        for item in items:
+            try:
+                dates.append(field.to_internal_value(item.get("date")))
+            except (AttributeError, serializers.ValidationError):
+                pass
+
+        return dates
+
+    @action(
+        detail=False,
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+        serializer_class=WorkDayExportSerializer,
+    )
+    def export(self, request):
+        """Stream the work days as csv or ndjson, ?users=all for admins"""
+        params = WorkDayExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if data["users"] == "all":
+            admin = UserPermissions(perm_list=["admin"])
+            if not admin.has_permission(request, self):
+                raise PermissionDenied()
+            query = WorkDay.objects.all()
+        else:
+            query = self.get_queryset()
+
+        if "from" in data:
+            query = query.filter(date__gte=data["from"])
+        if "to" in data:
+            query = query.filter(date__lte=data["to"])
+
+        rows = (
+            query.order_by("owner_id", "date")
+            .values_list(*self.export_fields)
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        if data["format"] == "csv":
+            stream, content_type = self.stream_csv(rows), "text/csv"
+        else:
+            stream, content_type = self.stream_ndjson(rows), "application/x-ndjson"
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="workdays.{data["format"]}"'
+        )
+        return response
+
+    def stream_csv(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.export_fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            row = dict(zip(self.export_fields, row))
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
 
 # TODO: Need Tests
 class WorkDayCalculate(views.APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(owner_condition)
+    def get(self, request):
+        """The same as post with the dates in the query,
+        so the result can be cached by the client"""
+        return self.calculate(request.query_params)
+
     def post(self, request):
-        res = WorkCaclulatorSerializer(data=request.data)
-        if res.is_valid():
-            start, end = res.data.values()
+        return self.calculate(request.data)
 
-        query = WorkDay.objects.filter(
-            owner=self.request.user, date__gte=start
-        ).exclude(date__gt=end)
+    def calculate(self, data):
+        res = WorkCaclulatorSerializer(data=data)
+        res.is_valid(raise_exception=True)
+        start, end = res.validated_data.values()
 
         # (0, "Normal"),
         # (1, "Weekend"),
@@ -65,30 +324,179 @@ class WorkDayCalculate(views.APIView):
         # (3, "Sick leave"),
         # (4, "Public holiday"),
         # (5, "Job Travel"),
-
-        query_0 = query.filter(day=0)
-        late_for_work = 0
-        overtime = 0
-        early_leave = 0
-
-        for i in query_0:
-            if i.before_work > 0:
-                late_for_work += i.before_work
-            if i.after_work >= 15:
-                overtime += i.after_work
-            if i.after_work < 0:
-                early_leave += i.after_work
-
-        data = {
-            "late_for_work": late_for_work,
-            "overtime": overtime,
-            "early_leave": early_leave,
-            "workdays": query_0.count(),
-            "weekend": query.filter(day=1).count(),
-            "times_off": query.filter(day=2).count(),
-            "sick_leaves": query.filter(day=3).count(),
-            "publick_holidays": query.filter(day=4).count(),
-            "job_travel": query.filter(day=5).count(),
-        }
+        user = self.request.user
+        data = cache.get_or_calculate(
+            user.pk,
+            start,
+            end,
+            lambda: rollup.totals(user, start, end),
+        )
 
         return Response(data=data)
+
+
+class WorkDaySeries(views.APIView):
+    """Calculator totals per day, week or month for the charts"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = SeriesSerializer
+
+    def get(self, request):
+        params = SeriesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        query = WorkDay.objects.filter(owner=self.request.user)
+        if "from" in data:
+            query = query.filter(date__gte=data["from"])
+        if "to" in data:
+            query = query.filter(date__lte=data["to"])
+
+        series = (
+            query.annotate(bucket=Trunc("date", data["bucket"]))
+            .order_by("bucket")
+            .values("bucket")
+            .annotate(**WorkDay.objects.totals_expressions())
+        )
+        return Response(data=list(series))
+
+
+class SyncView(views.APIView):
+    """The days and the shifts that changed after the cursor and
+    the tombstones of the deleted ones, the clients keep the
+    returned cursor for the next sync"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = SyncSerializer
+
+    def get(self, request):
+        params = SyncSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data.get("since")
+
+        cursor = timezone.now()
+        user = request.user
+        days = WorkDay.objects.filter(owner=user)
+        shifts = Shift.objects.filter(owner=user)
+        deleted = Tombstone.objects.none()
+        if since is not None:
+            retention = timedelta(days=settings.WORKTIME_TOMBSTONE_RETENTION_DAYS)
+            if since < cursor - retention:
+                return Response(
+                    data="The cursor is too old, please make a full sync",
+                    status=status.HTTP_410_GONE,
+                )
+
+            # the changes are applied by id, so giving some twice is fine
+            after = since - timedelta(seconds=settings.WORKTIME_SYNC_OVERLAP)
+            days = days.filter(updated_at__gt=after)
+            shifts = shifts.filter(edited_at__gt=after)
+            deleted = Tombstone.objects.filter(owner=user, deleted_at__gt=after)
+
+        return Response(
+            data={
+                "cursor": cursor,
+                "workdays": WorkDayDetailsSerializer(days, many=True).data,
+                "shifts": ShiftSerializer(shifts, many=True).data,
+                "deleted": TombstoneSerializer(deleted, many=True).data,
+            }
+        )
+
+
+class TeamCalculate(views.APIView):
+    """Calculate the work time of many users with one grouped query,
+    the result is streamed as a json list
+
+    The selected users without days in the range have zero totals"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated, UserPermissions(perm_list=["admin"])]
+    serializer_class = TeamCalculatorSerializer
+    chunk_size = 500
+
+    def post(self, request):
+        res = TeamCalculatorSerializer(data=request.data)
+        res.is_valid(raise_exception=True)
+        query = WorkDay.objects.filter(
+            date__gte=res.validated_data["from_date"],
+            date__lte=res.validated_data["to_date"],
+        )
+        users = res.validated_data["users"]
+        if users is not None:
+            query = query.filter(owner_id__in=users)
+
+        rows = (
+            query.order_by("owner_id")
+            .values("owner_id", "owner__email")
+            .annotate(**WorkDay.objects.totals_expressions())
+            .iterator(chunk_size=self.chunk_size)
+        )
+        if users is not None:
+            users = (
+                get_user_model()
+                .objects.filter(pk__in=users)
+                .order_by("pk")
+                .values_list("pk", "email")
+            )
+            rows = self.with_zero_rows(rows, list(users))
+
+        return StreamingHttpResponse(
+            self.stream(rows),
+            content_type="application/json",
+        )
+
+    def with_zero_rows(self, rows, users):
+        """Give the users without rows with zero totals,
+        the rows and the users are in the order of their ids"""
+        zeros = dict.fromkeys(WorkDay.objects.totals_expressions(), 0)
+        row = next(rows, None)
+        for pk, email in users:
+            if row is not None and row["owner_id"] == pk:
+                yield row
+                row = next(rows, None)
+            else:
+                yield {"owner_id": pk, "owner__email": email, **zeros}
+
+    def stream(self, rows):
+        yield "["
+        for i, row in enumerate(rows):
+            row["user"] = row.pop("owner_id")
+            row["email"] = row.pop("owner__email")
+            yield ("," if i else "") + json.dumps(row, cls=DjangoJSONEncoder)
+
+        yield "]"
+
+
+class ReportJobViewAPI(BaseViewAPI):
+    """Company wide reports, the report runs in the workers
+    and the request returns the job id immediately"""
+
+    serializer_class = ReportJobSerializer
+    queryset = ReportJob.objects.all()
+    permission_classes = [IsAuthenticated, UserPermissions(perm_list=["admin"])]
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def perform_create(self, serializer):
+        job = serializer.save()
+        transaction.on_commit(lambda: start_report.delay(str(job.pk)))
+
+    @action(detail=True)
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ReportJob.Status.DONE:
+            return Response(
+                data="The report is not ready",
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=f"report-{job.from_date}-{job.to_date}.csv",
+        )